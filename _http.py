@@ -0,0 +1,207 @@
+"""
+Shared HTTP session for the live test scripts.
+Every script talks to the same local server, so they reuse one pooled
+requests.Session instead of opening fresh connections per test.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import pathlib
+import time
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from requests.cookies import extract_cookies_to_jar, get_cookie_header
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BASE_URL = "http://localhost:5000"
+
+# Endpoint URLs the scripts hit, built once at import
+HOME_URL = BASE_URL + "/"
+HEALTH_URL = BASE_URL + "/healthz"
+SIGNIN_URL = BASE_URL + "/signin"
+DASHBOARD_URL = BASE_URL + "/dashboard"
+PRACTICE_URL = BASE_URL + "/practice"
+START_PRACTICE_URL = BASE_URL + "/start-practice"
+QUIZ_URL = BASE_URL + "/quiz"
+CHECKOUT_URL = BASE_URL + "/create-checkout-session"
+WEBHOOK_URL = BASE_URL + "/webhook"
+GENERATE_QUESTIONS_URL = BASE_URL + "/api/generate-questions"
+SUBMIT_ANSWER_URL = BASE_URL + "/api/submit-answer"
+
+# The app is served by gunicorn (or the werkzeug dev server locally), and
+# neither speaks HTTP/2, so an h2-capable client would still negotiate
+# HTTP/1.1 here. Concurrency instead comes from the keep-alive pool below,
+# which holds enough connections for the parallel probes to not queue.
+ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0)
+
+SESSION = requests.Session()
+SESSION.mount('http://', ADAPTER)
+# Everything is on loopback, so compression would only cost CPU on both
+# ends; test_optimizations_working asks for gzip/br itself when probing it
+SESSION.headers.update({
+    'User-Agent': 'prepforge-tests/1.0',
+    'Accept-Encoding': 'identity',
+})
+
+atexit.register(SESSION.close)
+
+
+def get_session():
+    """A fresh cookie jar on SESSION's connection pool.
+
+    For scripts that sign in as a user other than SESSION's, so their
+    login doesn't overwrite its cookies while sockets are still shared.
+    """
+    session = requests.Session()
+    session.mount('http://', ADAPTER)
+    session.headers.update(SESSION.headers)
+    return session
+
+# Bare urllib3 pool for hot API loops that don't need requests' extras
+POOL = urllib3.PoolManager(num_pools=4, maxsize=16, block=True)
+atexit.register(POOL.clear)
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+def wait_ready(session=SESSION, url=HEALTH_URL, timeout=5):
+    """Poll url until it answers 200, backing off from 20ms up to 0.5s.
+
+    Returns True as soon as the server is ready, or False once timeout
+    seconds have passed without a healthy response.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.02
+    while time.monotonic() < deadline:
+        try:
+            if session.get(url, timeout=0.5).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    return False
+
+
+def encode_json(payload, indent=False, default=None):
+    """Encode a request body to JSON bytes, via orjson when installed.
+
+    indent pretty-prints with two spaces; default converts objects JSON
+    can't encode, as in json.dumps.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=default, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(payload, indent=2 if indent else None, default=default).encode()
+
+
+def decode_json(body):
+    """Parse a JSON response body (bytes), via orjson when installed.
+
+    Both parsers raise a json.JSONDecodeError subclass on bad input.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+# Cookies of each account's last /signin, reused by login_once across runs.
+# Kept in the invoking user's own cache directory (0700, files 0600) and
+# ignored once older than COOKIE_MAX_AGE seconds.
+COOKIE_DIR = pathlib.Path(os.environ.get('XDG_CACHE_HOME') or pathlib.Path.home() / '.cache') / 'prepforge-tests'
+COOKIE_MAX_AGE = 3600
+
+
+def _cookie_file(email):
+    COOKIE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return COOKIE_DIR / f"cookies_{hashlib.sha256(email.encode()).hexdigest()[:16]}.json"
+
+
+def login_once(session, email, password):
+    """Sign session in as email, reusing the cookies of a recent sign-in.
+
+    Saved cookies are tried first and checked against /dashboard; only when
+    they are missing, expired or no longer get in does this post to /signin
+    (and make the server verify the password hash) again. Returns True once
+    signed in.
+    """
+    cookie_file = _cookie_file(email)
+    try:
+        fresh = time.time() - cookie_file.stat().st_mtime < COOKIE_MAX_AGE
+    except FileNotFoundError:
+        fresh = False
+    if fresh:
+        for cookie in decode_json(cookie_file.read_bytes()):
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+        if session.head(DASHBOARD_URL).status_code == 200:
+            return True
+        session.cookies.clear()
+
+    response = session.post(SIGNIN_URL, data={'email': email, 'password': password}, allow_redirects=False)
+    if response.status_code != 302:
+        return False
+    # Write then rename so a concurrent run never reads a half-written file
+    partial = cookie_file.with_suffix(f".{os.getpid()}.tmp")
+    fd = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(encode_json([
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+            for c in session.cookies
+        ]))
+    os.replace(partial, cookie_file)
+    return True
+
+
+# url -> (ETag, body) of the last 200 seen, for conditional re-fetches
+_ETAG_CACHE = {}
+
+
+def conditional_get(session, url, **kwargs):
+    """GET url, sending If-None-Match when an earlier response had an ETag.
+
+    A 304 is handed back as the cached 200 body, so callers read the result
+    exactly as they would a full download. Flask's static handler emits
+    strong ETags, so unchanged CSS and JS cost only the headers.
+    """
+    cached = _ETAG_CACHE.get(url)
+    if cached:
+        kwargs['headers'] = {**kwargs.get('headers', {}), 'If-None-Match': cached[0]}
+    response = session.get(url, **kwargs)
+    if response.status_code == 304 and cached:
+        response.status_code = 200
+        response._content = cached[1]
+    elif response.status_code == 200 and response.headers.get('ETag'):
+        _ETAG_CACHE[url] = (response.headers['ETag'], response.content)
+    return response
+
+
+def body_preview(response, limit=200):
+    """The start of a response body as text, for failure messages.
+
+    Decodes only the first limit bytes rather than the whole page.
+    """
+    return response.content[:limit].decode('utf-8', 'replace')
+
+
+def pool_request(session, method, url, body=None, headers=None):
+    """Send a request through POOL carrying the session's cookies.
+
+    Cookies are matched and stored by requests' own cookie helpers, so the
+    jar keeps each cookie's domain and path and a Set-Cookie on the response
+    replaces the session's cookie instead of sitting next to it.
+    """
+    request_headers = dict(headers or {})
+    prepared = requests.Request(method, url, headers=request_headers).prepare()
+    cookies = get_cookie_header(session.cookies, prepared)
+    if cookies:
+        request_headers['Cookie'] = cookies
+    response = POOL.request(method, url, body=body, headers=request_headers, redirect=False)
+    extract_cookies_to_jar(session.cookies, prepared, response)
+    return response
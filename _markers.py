@@ -0,0 +1,96 @@
+"""
+Multi-marker scanning for the live test scripts.
+Checks that look for many fixed substrings in one page compile them into
+a single regex so the page is scanned once rather than once per marker.
+"""
+
+import functools
+import pathlib
+import re
+
+from _http import decode_json
+
+CHECKS_FILE = pathlib.Path(__file__).with_name('page_checks.json')
+
+
+class MarkerSet:
+    """A fixed set of str or bytes markers searched for in one pass"""
+
+    def __init__(self, markers):
+        self.markers = tuple(dict.fromkeys(markers))
+        self._overlap = max(len(marker) for marker in self.markers) - 1
+        # Longest first so a marker that embeds another wins at a shared
+        # position; the lookahead keeps matches from consuming text so
+        # overlapping markers starting elsewhere are still seen.
+        ordered = sorted(self.markers, key=len, reverse=True)
+        if isinstance(ordered[0], bytes):
+            alternation = b'|'.join(map(re.escape, ordered))
+            self._pattern = re.compile(b'(?=(' + alternation + b'))')
+        else:
+            alternation = '|'.join(map(re.escape, ordered))
+            self._pattern = re.compile(f'(?=({alternation}))')
+
+    def find(self, content):
+        """Return the set of markers that occur anywhere in content"""
+        hits = set(self._pattern.findall(content))
+        return {
+            marker for marker in self.markers
+            if marker in hits or any(marker in hit for hit in hits)
+        }
+
+    def find_in_stream(self, response, chunk_size=8192):
+        """Return the markers found in a streamed (stream=True) bytes response.
+
+        Stops reading as soon as every marker has been seen and closes the
+        response, so the rest of the body is never downloaded.
+        """
+        found = set()
+        tail = b''
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                window = tail + chunk
+                found |= self.find(window)
+                if len(found) == len(self.markers):
+                    break
+                tail = window[-self._overlap:] if self._overlap else b''
+        finally:
+            response.close()
+        return found
+
+
+class CheckSpec:
+    """Named page checks, each passing when any of its markers is present"""
+
+    def __init__(self, checks):
+        self.checks = {
+            name: tuple(marker.encode() for marker in markers)
+            for name, markers in checks.items()
+        }
+        self.names = frozenset(self.checks)
+        self._owners = {}
+        for name, markers in self.checks.items():
+            for marker in markers:
+                self._owners.setdefault(marker, []).append(name)
+        self.markers = MarkerSet(self._owners)
+
+    def _passed(self, found):
+        return frozenset(name for marker in found for name in self._owners[marker])
+
+    def find(self, content):
+        """Return the names of the checks that pass on a bytes page"""
+        return self._passed(self.markers.find(content))
+
+    def find_in_stream(self, response, chunk_size=8192):
+        """Like find, but reading a stream=True response incrementally"""
+        return self._passed(self.markers.find_in_stream(response, chunk_size))
+
+
+@functools.cache
+def _load_checks_file():
+    return decode_json(CHECKS_FILE.read_bytes())
+
+
+@functools.cache
+def load_checks(group):
+    """CheckSpec for one group of page_checks.json, built once per process"""
+    return CheckSpec(_load_checks_file()[group])
@@ -0,0 +1,26 @@
+"""
+Buffered console output for the live test scripts.
+"""
+
+import functools
+import io
+import sys
+from contextlib import redirect_stdout
+
+
+def buffered_output(func):
+    """Collect everything func prints and write it to stdout in one go.
+
+    The buffer is flushed even when func raises, so a failing test still
+    shows the progress it printed before the failure.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buffer = io.StringIO()
+        try:
+            with redirect_stdout(buffer):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buffer.getvalue())
+            sys.stdout.flush()
+    return wrapper
@@ -13,7 +13,7 @@ from flask_login import login_required, current_user
 
 from app import db
 from models import Question, CachedQuestion
-from xai_question_generator import xai_generator
+from xai_question_generator import get_question_prefetcher, get_xai_generator
 from subscription_gate import subscription_gate
 
 logger = logging.getLogger(__name__)
@@ -65,15 +65,20 @@ def generate_questions():
             return jsonify({'error': f'Invalid exam type. Must be one of: {valid_exams}'}), 400
         
         # Check if xAI generator is available
+        xai_generator = get_xai_generator()
         if not xai_generator:
             logger.error("❌ xAI generator not initialized")
             return jsonify({'error': 'Question generation service unavailable'}), 503
+        question_prefetcher = get_question_prefetcher()
             
         logger.info(f"🚀 Generating {count} {exam_type} questions for user {current_user.id}")
         
-        # Generate questions using xAI (Grok)
+        # Generate questions using xAI (Grok). With prefetching on, they're
+        # served from the exam's prefetched pool where it has enough ready;
+        # requests with a topic are always generated live
         try:
-            questions = xai_generator.generate_questions(
+            generate = question_prefetcher.take_questions if question_prefetcher else xai_generator.generate_questions
+            questions = generate(
                 exam_type=exam_type,
                 topic=topic,
                 count=count
@@ -140,6 +145,7 @@ def generate_questions():
 def test_xai_integration():
     """Test xAI integration with GRE algebra question"""
     try:
+        xai_generator = get_xai_generator()
         if not xai_generator:
             return jsonify({'error': 'xAI generator not initialized'}), 503
             
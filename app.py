@@ -63,6 +63,10 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
 }
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Let browsers (and the test scripts) reuse static CSS/JS for an hour;
+# Flask's static handler already sends an ETag and answers If-None-Match
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 3600
+
 # Enhanced session configuration for better security and user experience
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=30)
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
@@ -172,6 +176,11 @@ class ExamForm(FlaskForm):
 def index():
     return render_template('index.html')
 
+@app.route('/healthz')
+def healthz():
+    """Cheap readiness probe: no auth, no database"""
+    return jsonify({'status': 'ok'})
+
 @app.route('/quiz')
 @login_required
 def quiz():
@@ -966,6 +975,12 @@ def _legacy_cache_initialization():
 with app.app_context():
     from models import User, Question, UserProgress, Subscription, CachedQuestion, Badge, UserBadge, Streak
     db.create_all()
+    # create_all leaves existing tables alone, so add indexes declared after
+    # their table was first created
+    db.session.execute(db.text(
+        "CREATE INDEX IF NOT EXISTS ix_user_progress_user_exam ON user_progress (user_id, exam_type)"
+    ))
+    db.session.commit()
 
     # Initialize badges
     initialize_badges()
@@ -0,0 +1,95 @@
+"""
+Shared pytest fixtures for the live integration tests.
+"""
+
+import functools
+import os
+import pickle
+
+import pytest
+
+from _http import BASE_URL, SESSION, SIGNIN_URL, wait_ready
+
+# Markers for the nominal Stripe phases that TEST_MINIMAL leaves out
+MINIMAL_EXCLUDED_MARKERS = frozenset({'checkout', 'webhook'})
+
+# User ID 7, the account the live flow tests run as
+TEST_USER = {
+    'email': 'anothermobile14@gmail.com',
+    'password': 'Tobeornottobe@123'
+}
+
+
+# Test files that change TEST_USER's state (answers, question limits, the
+# Pro upgrade) without going through authed_session
+TEST_USER_MODULES = frozenset({
+    'test_complete_quiz_flow_with_mixpanel.py',
+    'test_complete_stripe_flow.py',
+    'test_performance_mobile.py',
+    'test_stripe_integration.py',
+    'test_unique_adaptive_questions.py',
+})
+
+
+def pytest_collection_modifyitems(config, items):
+    """Group TEST_USER's tests for xdist and apply TEST_MINIMAL.
+
+    Every test acting as TEST_USER joins one xdist_group, so parallel runs
+    (pytest -n auto --dist=loadgroup) hand them all to a single worker.
+    With TEST_MINIMAL set, the checkout and webhook phases are deselected;
+    deselecting (rather than skipping) keeps them out of session.items,
+    so fixtures that run phases for the selected tests leave them alone.
+    """
+    for item in items:
+        if item.path.name in TEST_USER_MODULES or 'authed_session' in getattr(item, 'fixturenames', ()):
+            item.add_marker(pytest.mark.xdist_group('test_user'))
+
+    if not os.environ.get('TEST_MINIMAL'):
+        return
+    kept, deselected = [], []
+    for item in items:
+        names = {mark.name for mark in item.iter_markers()}
+        (deselected if names & MINIMAL_EXCLUDED_MARKERS else kept).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = kept
+
+
+@functools.cache
+def _server_ready():
+    return wait_ready()
+
+
+@pytest.fixture(autouse=True)
+def server_ready(request):
+    """Wait (once per process) for /healthz before any integration test"""
+    if request.node.get_closest_marker('integration'):
+        assert _server_ready(), f"App at {BASE_URL} did not become ready"
+
+
+@pytest.fixture(scope="session")
+def authed_session(tmp_path_factory):
+    """Shared SESSION signed in as TEST_USER, once per test run.
+
+    The cookie jar is pickled into the run's temp directory, keyed by
+    email, so parallel xdist workers reuse the first worker's login
+    instead of each posting to /signin.
+    """
+    basetemp = tmp_path_factory.getbasetemp()
+    if os.environ.get('PYTEST_XDIST_WORKER'):
+        # Workers each get a subdirectory; share the run-level parent
+        basetemp = basetemp.parent
+    cookie_file = basetemp / f"cookies_{TEST_USER['email']}.pkl"
+
+    if cookie_file.exists():
+        SESSION.cookies.update(pickle.loads(cookie_file.read_bytes()))
+        return SESSION
+
+    response = SESSION.post(SIGNIN_URL, data=TEST_USER, allow_redirects=False)
+    assert response.status_code in (200, 302), f"Signin failed: {response.status_code}"
+    # Write then rename so a worker racing this one never unpickles a
+    # half-written jar; os.replace is atomic within one directory
+    partial = cookie_file.with_suffix(f".{os.getpid()}.tmp")
+    partial.write_bytes(pickle.dumps(SESSION.cookies))
+    os.replace(partial, cookie_file)
+    return SESSION
@@ -6,7 +6,7 @@ Tests API connectivity and response format without using many credits
 
 import os
 import sys
-from xai_question_generator import XAIQuestionGenerator
+from xai_question_generator import XAIQuestionGenerator, get_xai_generator
 
 def test_xai_minimal():
     """Test xAI integration with minimal API usage"""
@@ -14,8 +14,9 @@ def test_xai_minimal():
     print("=" * 40)
     
     try:
-        # Initialize generator
-        generator = XAIQuestionGenerator()
+        # Reuse the module's generator; constructing one here only when that
+        # failed to start, so the real error is raised and reported below
+        generator = get_xai_generator() or XAIQuestionGenerator()
         print("✅ XAI generator initialized")
         
         # Test API connection with very short prompt to minimize credit usage
@@ -256,6 +256,9 @@ class UserProgress(db.Model):
     cognitive_load = db.Column(db.Float, default=0.0)
     answered_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Per-user, per-exam progress counts back the trial limits
+    __table_args__ = (db.Index('ix_user_progress_user_exam', 'user_id', 'exam_type'),)
+
     def __repr__(self):
         return f'<UserProgress {self.user_id} - {self.question_id} ({self.answered_correctly})>'
 
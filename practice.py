@@ -1,7 +1,7 @@
 import logging
 import json
 import random
-from flask import Blueprint, render_template, session, redirect, url_for, request, flash, jsonify
+from flask import Blueprint, render_template, session, redirect, url_for, request, flash, jsonify, make_response
 from flask_login import login_required, current_user
 from flask_wtf import FlaskForm
 from wtforms import RadioField, HiddenField
@@ -664,7 +664,7 @@ def show_question():
         simple_explanation = None
         session.pop('is_correct', None)
     
-    return render_template('practice.html',
+    response = make_response(render_template('practice.html',
                          question=question,
                          show_feedback=show_feedback,
                          user_answer=user_answer,
@@ -675,7 +675,10 @@ def show_question():
                          new_badges=new_badges,
                          tech_explanation=tech_explanation,
                          simple_explanation=simple_explanation,
-                         mixpanel_token=None)
+                         mixpanel_token=None))
+    # Let clients revalidate an unchanged page with If-None-Match (304, no body)
+    response.add_etag()
+    return response.make_conditional(request)
 
 @practice.route('/submit-answer', methods=['POST'])
 @login_required
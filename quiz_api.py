@@ -1,36 +1,20 @@
 """
 Quiz API endpoints for interactive question practice
-Handles question generation, answer submission, and user progress tracking
+Handles answer submission and user progress tracking; question generation
+is served by ai_question_api
 """
 
 import os
 import json
 import logging
 from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 
 # Initialize blueprint
 quiz_api = Blueprint('quiz_api', __name__)
 logger = logging.getLogger(__name__)
 
-def get_user_performance(user_id: int, exam_type: str, topic: str):
-    """Get user performance for adaptive difficulty"""
-    try:
-        from models import UserPerformance
-        performance = UserPerformance.query.filter_by(
-            user_id=user_id,
-            exam_type=exam_type,
-            topic=topic
-        ).first()
-        
-        logger.info(f"📊 Retrieved performance for user {user_id}: {exam_type} - {topic} = {performance.score if performance else 'No data'}")
-        return performance
-        
-    except Exception as e:
-        logger.error(f"❌ Error retrieving user performance: {e}")
-        return None
-
 def update_user_performance(user_id: int, exam_type: str, topic: str, score: float):
     """Update or create user performance record"""
     try:
@@ -72,272 +56,6 @@ def update_user_performance(user_id: int, exam_type: str, topic: str, score: flo
         db.session.rollback()
         return None
 
-def determine_difficulty(score: float) -> str:
-    """Determine difficulty level based on user score"""
-    if score < 40:
-        return 'easy'
-    elif score <= 70:
-        return 'medium'
-    else:
-        return 'hard'
-
-def generate_unique_fallback_question(exam_type: str, topic: str, difficulty: str, index: int, timestamp: int):
-    """Generate unique fallback question when xAI fails"""
-    import random
-    import hashlib
-    
-    # Create unique content based on timestamp and index
-    unique_hash = hashlib.md5(f"{timestamp}{index}{exam_type}{topic}".encode()).hexdigest()[:8]
-    
-    if exam_type == 'GRE' and topic == 'algebra':
-        # Generate unique algebraic problems
-        a = random.randint(2, 9)
-        b = random.randint(1, 8)
-        c = random.randint(1, 12)
-        
-        if difficulty == 'easy':
-            question_text = f"Solve for x: {a}x + {b} = {c * a + b}"
-            correct_val = c
-            # Create numeric options for algebra
-            options = [str(correct_val), str(correct_val + 1), str(correct_val - 1), str(correct_val + 2)]
-        elif difficulty == 'hard':
-            question_text = f"If {a}x² - {b}x + {c} = 0, what is the discriminant?"
-            correct_val = b*b - 4*a*c
-            # Create numeric options for discriminant
-            options = [str(correct_val), str(correct_val + 4), str(correct_val - 4), str(abs(correct_val) + 1)]
-        else:  # medium
-            question_text = f"What is {a} × {b} + {c}?"
-            correct_val = a * b + c
-            # Create numeric options for arithmetic
-            options = [str(correct_val), str(correct_val + 1), str(correct_val - 1), str(correct_val + 2)]
-            
-        correct_option = options[0]  # The first option is always correct
-        
-        # Shuffle the options but track where the correct answer ends up
-        import random
-        shuffled_options = options.copy()
-        random.shuffle(shuffled_options)
-        
-        # Find the index of the correct answer after shuffling
-        correct_index = shuffled_options.index(correct_option)
-        correct_letter = chr(65 + correct_index)  # Convert to A, B, C, D
-        
-        return {
-            'id': f"fallback_{unique_hash}_{timestamp}_{index}",
-            'question_text': question_text,
-            'choices': shuffled_options,  # Clean options without A/B/C/D prefixes
-            'correct_answer': correct_letter,  # Letter corresponding to correct option position
-            'explanation': f"Unique {exam_type} {topic} question ({difficulty} level) - Generated at {timestamp}",
-            'difficulty': difficulty,
-            'topic': topic,
-            'exam_type': exam_type,
-            'source': 'unique_fallback',
-            'generation_time': timestamp
-        }
-    else:
-        # Generic unique fallback
-        return {
-            'id': f"fallback_{unique_hash}_{timestamp}_{index}",
-            'question_text': f"Unique {exam_type} {topic} question #{index} - What concept is most important in {topic}? (Generated: {timestamp})",
-            'choices': [f"Concept {unique_hash[:2]}", f"Concept {unique_hash[2:4]}", f"Concept {unique_hash[4:6]}", "All concepts"],  # Clean options without prefixes
-            'correct_answer': 'D',
-            'explanation': f"All concepts in {topic} are important for {exam_type} success. This is a unique question generated at timestamp {timestamp}.",
-            'difficulty': difficulty,
-            'topic': topic,
-            'exam_type': exam_type,
-            'source': 'unique_fallback',
-            'generation_time': timestamp
-        }
-
-def simple_rate_limit():
-    """Simple rate limiting decorator with per-exam-type tracking"""
-    def decorator(f):
-        def wrapper(*args, **kwargs):
-            from flask import session, request
-            
-            # Get exam type from request
-            data = request.get_json() or {}
-            exam_type = data.get('exam_type', 'GRE')
-            
-            # Track requests per exam type
-            session_key = f'api_requests_{exam_type}'
-            request_count = session.get(session_key, 0)
-            
-            if request_count >= 20:
-                return jsonify({
-                    'error': f'Daily limit of 20 questions reached for {exam_type}. Upgrade to Pro for unlimited access.',
-                    'code': 'rate_limit_exceeded',
-                    'limit': 20,
-                    'remaining': 0,
-                    'exam_type': exam_type
-                }), 429
-                
-            session[session_key] = request_count + 1
-            return f(*args, **kwargs)
-        wrapper.__name__ = f.__name__
-        return wrapper
-    return decorator
-
-@quiz_api.route('/api/generate-questions', methods=['POST'])
-@login_required
-@simple_rate_limit()
-def generate_questions():
-    """
-    Generate unique questions with adaptive difficulty using xAI integration
-    """
-    try:
-        # Import models here to avoid circular imports
-        from models import db, UserPerformance
-        import uuid
-        import time
-        
-        data = request.get_json() or {}
-        exam_type = data.get('exam_type', 'GRE')
-        topic = data.get('topic', 'algebra')
-        count = min(data.get('count', 1), 5)  # Limit to 5 questions max
-        
-        logger.info(f"🚀 Generating {count} UNIQUE {exam_type} questions for user {current_user.id}, topic: {topic}")
-        
-        # Get user performance for adaptive difficulty
-        user_performance = get_user_performance(current_user.id, exam_type, topic)
-        difficulty = determine_difficulty(user_performance.score if user_performance else 50.0)
-        
-        logger.info(f"📊 User performance: {user_performance.score if user_performance else 'No data'}, Difficulty: {difficulty}")
-        
-        # Generate unique questions using xAI
-        questions = []
-        
-        try:
-            # Initialize xAI generator
-            from xai_question_generator import XAIQuestionGenerator
-            xai_generator = XAIQuestionGenerator()
-            
-            # Create unique system prompt enforcing uniqueness
-            timestamp = int(time.time())
-            unique_session_id = str(uuid.uuid4())[:8]
-            
-            system_prompt = f"""Generate UNIQUE {exam_type} {topic} questions that are:
-1. NEVER repeated - each question must be completely different from any previous questions
-2. Specific to {topic} at {difficulty} difficulty level
-3. Educational and challenging
-4. Session ID: {unique_session_id} - Use this to ensure uniqueness
-5. Current time: {timestamp} - Include time-based variation
-
-IMPORTANT: Generate completely different questions each time. Avoid any repetition of content, numbers, or concepts from previous generations. Make each question unique in topic focus, numbers used, and approach."""
-            
-            # Generate questions with enforced uniqueness  
-            for i in range(count):
-                unique_topic_variant = f"{topic}_variant_{i}_{timestamp}"
-                
-                try:
-                    question_data = xai_generator.generate_single_question(
-                        exam_type=exam_type,
-                        topic=unique_topic_variant,
-                        difficulty=difficulty,
-                        system_prompt=system_prompt,
-                        enforce_uniqueness=True
-                    )
-                    
-                    if question_data:
-                        # Ensure clean options without letter prefixes
-                        if 'choices' in question_data:
-                            import re
-                            clean_choices = []
-                            for choice in question_data['choices']:
-                                if isinstance(choice, str):
-                                    # Remove letter prefixes like "A.", "B)", etc.
-                                    clean_choice = re.sub(r'^[A-D][.)]\s*', '', choice).strip()
-                                    clean_choices.append(clean_choice)
-                                else:
-                                    clean_choices.append(choice)
-                            question_data['choices'] = clean_choices
-                        
-                        # Add uniqueness markers
-                        question_data['id'] = f"xai_{exam_type}_{unique_session_id}_{i}_{timestamp}"
-                        question_data['topic'] = topic
-                        question_data['difficulty'] = difficulty
-                        question_data['source'] = 'xai_unique'
-                        question_data['generation_time'] = timestamp
-                        question_data['session_id'] = unique_session_id
-                        
-                        # Enhance explanation with detailed sections
-                        if 'explanation' in question_data:
-                            original_explanation = question_data['explanation']
-                            question_data['explanation'] = {
-                                'technical': original_explanation,
-                                'simple': f"In simple terms: {original_explanation[:200]}...",
-                                'key_concepts': self.extract_key_concepts(original_explanation, exam_type)
-                            }
-                        else:
-                            question_data['explanation'] = {
-                                'technical': 'Technical explanation not available.',
-                                'simple': 'Simple explanation not available.',
-                                'key_concepts': ['Core concepts for this question type']
-                            }
-                        
-                        questions.append(question_data)
-                        logger.info(f"✅ Generated unique question {i+1}/{count}: {question_data['id']}")
-                    else:
-                        logger.warning(f"⚠️ xAI failed to generate question {i+1}, using fallback")
-                        # Fallback with unique content
-                        fallback_question = generate_unique_fallback_question(exam_type, topic, difficulty, i, timestamp)
-                        questions.append(fallback_question)
-                        
-                except Exception as q_error:
-                    logger.warning(f"⚠️ Error generating question {i+1}: {q_error}, using fallback")
-                    fallback_question = generate_unique_fallback_question(exam_type, topic, difficulty, i, timestamp)
-                    questions.append(fallback_question)
-                
-                # Small delay to ensure uniqueness
-                time.sleep(0.1)
-                
-        except Exception as xai_error:
-            logger.error(f"❌ xAI generation failed: {xai_error}")
-            # Generate unique fallback questions
-            for i in range(count):
-                fallback_question = generate_unique_fallback_question(exam_type, topic, difficulty, i, int(time.time()))
-                questions.append(fallback_question)
-        
-        # Track Mixpanel event
-        try:
-            if current_app.config.get('MIXPANEL_TOKEN'):
-                from analytics import track_mixpanel_event
-                track_mixpanel_event(current_user.id, 'Question Generated', {
-                    'exam_type': exam_type,
-                    'topic': topic,
-                    'difficulty': difficulty,
-                    'count': len(questions),
-                    'source': 'xai_unique'
-                })
-        except Exception as e:
-            logger.warning(f"Mixpanel tracking failed: {e}")
-        
-        if not questions:
-            return jsonify({
-                'error': 'Failed to generate questions. Please try again.',
-                'code': 'generation_failed'
-            }), 500
-        
-        # Calculate remaining questions for free users per exam type
-        from flask import session
-        session_key = f'api_requests_{exam_type}'
-        remaining = max(0, 20 - session.get(session_key, 0))
-        
-        return jsonify({
-            'success': True,
-            'questions': questions,
-            'count': len(questions),
-            'questions_remaining': remaining,
-            'exam_type': exam_type
-        })
-        
-    except Exception as e:
-        logger.error(f"Error in generate_questions: {e}")
-        return jsonify({
-            'error': 'Internal server error',
-            'code': 'server_error'
-        }), 500
-
 @quiz_api.route('/api/submit-answer', methods=['POST'])
 @login_required
 def submit_answer():
@@ -559,30 +277,3 @@ def server_error_handler(e):
         'error': 'Internal server error',
         'code': 'server_error'
     }), 500
-
-def extract_key_concepts(explanation_text: str, exam_type: str) -> list:
-    """Extract key concepts from explanation text"""
-    try:
-        # Basic concept extraction based on exam type
-        if exam_type in ['GRE', 'GMAT']:
-            concepts = ['Critical reasoning', 'Logical analysis', 'Problem solving']
-        elif exam_type in ['MCAT', 'USMLE_STEP_1', 'USMLE_STEP_2']:
-            concepts = ['Medical knowledge', 'Clinical reasoning', 'Diagnostic skills']
-        elif exam_type == 'LSAT':
-            concepts = ['Legal reasoning', 'Logical deduction', 'Argument analysis']
-        else:
-            concepts = ['Core knowledge', 'Application skills', 'Critical thinking']
-        
-        # Try to extract specific concepts from explanation
-        if 'formula' in explanation_text.lower():
-            concepts.append('Mathematical formulas')
-        if 'theorem' in explanation_text.lower():
-            concepts.append('Theoretical principles')
-        if 'method' in explanation_text.lower():
-            concepts.append('Problem-solving methods')
-            
-        return concepts[:3]  # Limit to 3 key concepts
-        
-    except Exception as e:
-        logger.warning(f"Error extracting key concepts: {e}")
-        return ['Core concepts', 'Problem analysis', 'Application skills']
\ No newline at end of file
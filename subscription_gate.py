@@ -7,6 +7,10 @@ import os
 import json
 import redis
 import logging
+import threading
+import atexit
+import uuid
+from collections import deque
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
@@ -14,6 +18,11 @@ from flask_login import current_user
 from models import db, User
 from sqlalchemy import func, and_
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +32,15 @@ redis_client = None
 try:
     redis_url = os.environ.get('REDIS_URL')
     if redis_url:
-        redis_client = redis.from_url(redis_url, decode_responses=True)
+        # One client per process; its pool keeps connections open across
+        # gate checks, and idle ones are pinged before reuse so a dropped
+        # socket doesn't fail (and fail open) the next check
+        redis_client = redis.from_url(
+            redis_url,
+            decode_responses=True,
+            max_connections=32,
+            health_check_interval=30
+        )
         # Test connection
         redis_client.ping()
         logger.info("✅ Redis connected successfully for rate limiting")
@@ -52,63 +69,147 @@ class UserActivity(db.Model):
     # Unique constraint to ensure one record per user per day
     __table_args__ = (db.UniqueConstraint('user_id', 'date', name='_user_date_uc'),)
 
+class MixpanelEventQueue:
+    """Buffers Mixpanel events and sends them in batches off the request path"""
+    
+    BATCH_SIZE = 10  # Wake the sender once this many events are waiting
+    MAX_BATCH = 50  # Most events Mixpanel's /track takes per request
+    FLUSH_INTERVAL = 5  # Seconds between sends when traffic is light
+    MAX_PENDING = 100  # Oldest events are dropped beyond this
+    
+    def __init__(self, token):
+        self.token = token
+        self.pending = deque(maxlen=self.MAX_PENDING)
+        self.wakeup = threading.Event()
+        self.flush_lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.sender_thread = None
+        
+    def push(self, event):
+        """Queue an event; returns immediately"""
+        self.pending.append(event)
+        self._ensure_sender()
+        if len(self.pending) >= self.BATCH_SIZE:
+            self.wakeup.set()
+            
+    def _ensure_sender(self):
+        # Started on first use (and restarted after a worker fork) rather
+        # than at import
+        if self.sender_thread and self.sender_thread.is_alive():
+            return
+        with self.start_lock:
+            if self.sender_thread and self.sender_thread.is_alive():
+                return
+            self.sender_thread = threading.Thread(
+                target=self._send_loop,
+                daemon=True,
+                name="MixpanelEventQueue"
+            )
+            self.sender_thread.start()
+            
+    def _send_loop(self):
+        while True:
+            self.wakeup.wait(self.FLUSH_INTERVAL)
+            self.wakeup.clear()
+            self.flush()
+            
+    def flush(self):
+        """Send every pending event, up to MAX_BATCH per request"""
+        with self.flush_lock:
+            while self.pending:
+                batch = [self.pending.popleft() for _ in range(min(len(self.pending), self.MAX_BATCH))]
+                self._send(batch)
+                
+    @staticmethod
+    def _encode(batch):
+        # orjson, when installed, emits UTF-8 bytes directly and much faster
+        if orjson is not None:
+            return orjson.dumps(batch)
+        return json.dumps(batch)
+        
+    def _send(self, batch):
+        try:
+            import requests
+            
+            response = requests.post(
+                "https://api.mixpanel.com/track",
+                data={
+                    "data": self._encode(batch),
+                    "api_key": self.token
+                },
+                timeout=5
+            )
+            
+            if response.status_code == 200:
+                logger.info(f"📊 Mixpanel: {len(batch)} events tracked")
+            else:
+                logger.warning(f"⚠️  Mixpanel tracking failed: {response.status_code}")
+                
+        except Exception as e:
+            logger.warning(f"⚠️  Mixpanel error: {e}")
+
+mixpanel_queue = MixpanelEventQueue(mixpanel_token) if mixpanel_token else None
+if mixpanel_queue:
+    atexit.register(mixpanel_queue.flush)
+
 def track_mixpanel_event(event_name, user_id, properties=None):
-    """Track events in Mixpanel with fallback logging"""
-    if not mixpanel_token:
+    """Queue an event for Mixpanel with fallback logging"""
+    if not mixpanel_queue:
         logger.info(f"📊 Analytics: {event_name} for user {user_id} (Mixpanel disabled)")
         return
     
-    try:
-        import requests
-        
-        event_data = {
-            "event": event_name,
-            "properties": {
-                "distinct_id": str(user_id),
-                "time": int(datetime.utcnow().timestamp()),
-                **(properties or {})
-            }
+    mixpanel_queue.push({
+        "event": event_name,
+        "properties": {
+            "distinct_id": str(user_id),
+            "time": int(datetime.utcnow().timestamp()),
+            **(properties or {})
         }
-        
-        # Send to Mixpanel
-        response = requests.post(
-            "https://api.mixpanel.com/track",
-            data={
-                "data": json.dumps(event_data),
-                "api_key": mixpanel_token
-            },
-            timeout=5
-        )
-        
-        if response.status_code == 200:
-            logger.info(f"📊 Mixpanel: {event_name} tracked for user {user_id}")
-        else:
-            logger.warning(f"⚠️  Mixpanel tracking failed: {response.status_code}")
-            
-    except Exception as e:
-        logger.warning(f"⚠️  Mixpanel error: {e}")
+    })
+
+def free_user_key(user_id, day=None):
+    """Redis key holding a free user's question count for one (UTC) day"""
+    day = day or datetime.utcnow().date()
+    return f"free_user_daily:{user_id}:{day.isoformat()}"
+
+# Daily count per free user. Reads the count and, only when under the
+# limit, INCRs it (setting the expiry on the first question of the day) in
+# one script, so the check and the count can't race between workers.
+# Returns the count before this request.
+FREE_DAY_SCRIPT = """
+local count = tonumber(redis.call('GET', KEYS[1]) or '0')
+if count < tonumber(ARGV[1]) then
+    if redis.call('INCR', KEYS[1]) == 1 then
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+    end
+end
+return count
+"""
+free_day = redis_client.register_script(FREE_DAY_SCRIPT) if redis_client else None
 
 def check_free_user_limit(user_id):
-    """Check if free user has exceeded daily 20-question limit"""
+    """Check if free user has exceeded daily 20-question limit.
+
+    With Redis this also records the question when it is allowed, so
+    concurrent requests can't all read the same count and slip past 20.
+    """
     today = datetime.utcnow().date()
     
     try:
-        # Get or create today's activity record
-        activity = UserActivity.query.filter_by(
+        if redis_client:
+            # One script call on an in-memory counter instead of a row lookup/insert
+            current_count = free_day(keys=[free_user_key(user_id, today)], args=[20, 86400])
+            limit_exceeded = current_count >= 20
+            
+            logger.info(f"📊 Free user {user_id}: {current_count}/20 questions today (Redis)")
+            return not limit_exceeded, current_count, 20
+        
+        # Just the count column; a missing row means nothing asked yet today,
+        # and increment_user_count creates it on the first question
+        current_count = db.session.query(UserActivity.question_count).filter_by(
             user_id=user_id, 
             date=today
-        ).first()
-        
-        if not activity:
-            # Create new activity record
-            activity = UserActivity()
-            activity.user_id = user_id
-            activity.date = today
-            activity.question_count = 0
-            db.session.add(activity)
-            db.session.commit()
-            
-        current_count = activity.question_count
+        ).scalar() or 0
         limit_exceeded = current_count >= 20
         
         logger.info(f"📊 Free user {user_id}: {current_count}/20 questions today")
@@ -119,17 +220,37 @@ def check_free_user_limit(user_id):
         # Fail open - allow request if database error
         return True, 0, 20
 
+# Rolling 60s window per pro user, kept as a sorted set of request times.
+# Drops entries older than the window, counts the rest and, only when under
+# the limit, records this request, all in one script so concurrent workers
+# can't both slip in under the limit. Returns the count before this request.
+PRO_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window)
+end
+return count
+"""
+pro_window = redis_client.register_script(PRO_WINDOW_SCRIPT) if redis_client else None
+
 def check_pro_user_limit(user_id):
-    """Check if pro user has exceeded 10 questions/minute limit"""
+    """Check if pro user has exceeded 10 questions/minute limit.
+
+    With Redis this also records the request when it is allowed, so the
+    window check and the count can't race.
+    """
     try:
         if redis_client:
-            # Use Redis for pro user rate limiting
-            key = f"pro_user_rate:{user_id}"
-            current_minute = int(datetime.utcnow().timestamp() // 60)
-            redis_key = f"{key}:{current_minute}"
-            
-            current_count_str = redis_client.get(redis_key)
-            current_count = int(current_count_str) if current_count_str else 0
+            # Use Redis for pro user rate limiting (sliding window, EVALSHA)
+            now_ms = int(datetime.utcnow().timestamp() * 1000)
+            current_count = pro_window(
+                keys=[f"pro_user_window:{user_id}"],
+                args=[now_ms, 60000, 10, f"{now_ms}:{uuid.uuid4().hex}"]
+            )
             
             limit_exceeded = current_count >= 10
             
@@ -153,15 +274,11 @@ def check_pro_user_limit(user_id):
 def increment_user_count(user_id, is_pro=False):
     """Increment the user's question count"""
     try:
-        if is_pro and redis_client:
-            # Increment Redis counter for pro users
-            current_minute = int(datetime.utcnow().timestamp() // 60)
-            key = f"pro_user_rate:{user_id}:{current_minute}"
-            redis_client.incr(key)
-            redis_client.expire(key, 120)  # Expire after 2 minutes
-            logger.info(f"📊 Incremented pro user {user_id} count in Redis")
+        if redis_client:
+            # check_free_user_limit / check_pro_user_limit already recorded it
+            return
         else:
-            # Increment PostgreSQL counter for free users (or pro fallback)
+            # Increment PostgreSQL counter when Redis isn't available
             today = datetime.utcnow().date()
             activity = UserActivity.query.filter_by(
                 user_id=user_id, 
@@ -10,6 +10,8 @@ import json
 import logging
 from datetime import datetime
 
+from _http import conditional_get
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -49,7 +51,7 @@ class CompleteUIFixesTest:
                 ]
                 
                 # Check JavaScript functionality
-                js_response = self.session.get(f'{self.base_url}/static/js/quiz.js')
+                js_response = conditional_get(self.session, f'{self.base_url}/static/js/quiz.js')
                 if js_response.status_code == 200:
                     js_content = js_response.text
                     
@@ -116,7 +118,7 @@ class CompleteUIFixesTest:
         
         try:
             # Check CSS for mobile optimizations
-            response = self.session.get(f'{self.base_url}/static/css/style.css')
+            response = conditional_get(self.session, f'{self.base_url}/static/css/style.css')
             
             if response.status_code == 200:
                 css_content = response.text
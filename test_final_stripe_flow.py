@@ -6,14 +6,44 @@ Complete end-to-end test of the upgrade flow
 
 import requests
 import time
-import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from _http import encode_json
+
+TEST_USER_EMAIL = 'anothermobile15@gmail.com'
+
+# Simulated checkout.session.completed event, encoded once at import
+WEBHOOK_PAYLOAD = {
+    "type": "checkout.session.completed",
+    "data": {
+        "object": {
+            "id": "cs_test_final_123456789",
+            "client_reference_id": "15",  # User ID 15
+            "customer_email": TEST_USER_EMAIL,
+            "payment_status": "paid",
+            "subscription": "sub_test_final_123456789",
+            "metadata": {
+                "user_id": "15",
+                "upgrade_type": "pro"
+            }
+        }
+    }
+}
+WEBHOOK_BODY = encode_json(WEBHOOK_PAYLOAD)
 
 class FinalStripeTest:
     def __init__(self):
         self.base_url = "http://localhost:5000"
+        self.url_signin = f"{self.base_url}/signin"
+        self.url_checkout = f"{self.base_url}/create-checkout-session"
+        self.url_webhook = f"{self.base_url}/webhook"
+        self.url_gen = f"{self.base_url}/api/generate-questions"
         self.session = requests.Session()
+        # Room for the concurrent per-exam generation probes
+        self.session.mount('http://', HTTPAdapter(pool_maxsize=4))
         self.test_user = {
-            'email': 'anothermobile15@gmail.com',
+            'email': TEST_USER_EMAIL,
             'password': 'Tobeornottobe@123'
         }
         
@@ -26,7 +56,7 @@ class FinalStripeTest:
             'password': self.test_user['password']
         }
         
-        response = self.session.post(f"{self.base_url}/signin", data=signin_data)
+        response = self.session.post(self.url_signin, data=signin_data)
         
         if response.status_code == 200 and 'dashboard' in response.url:
             print("✅ User authenticated successfully")
@@ -39,7 +69,7 @@ class FinalStripeTest:
         """Test creating a Stripe checkout session"""
         print("💳 Testing Stripe checkout session creation...")
         
-        response = self.session.post(f"{self.base_url}/create-checkout-session", allow_redirects=False)
+        response = self.session.post(self.url_checkout, allow_redirects=False)
         
         print(f"Response status: {response.status_code}")
         
@@ -66,26 +96,9 @@ class FinalStripeTest:
         """Simulate a successful payment webhook"""
         print("🎭 Simulating successful payment webhook...")
         
-        webhook_payload = {
-            "type": "checkout.session.completed",
-            "data": {
-                "object": {
-                    "id": "cs_test_final_123456789",
-                    "client_reference_id": "15",  # User ID 15
-                    "customer_email": self.test_user['email'],
-                    "payment_status": "paid",
-                    "subscription": "sub_test_final_123456789",
-                    "metadata": {
-                        "user_id": "15",
-                        "upgrade_type": "pro"
-                    }
-                }
-            }
-        }
-        
         response = self.session.post(
-            f"{self.base_url}/webhook",
-            json=webhook_payload,
+            self.url_webhook,
+            data=WEBHOOK_BODY,
             headers={'Content-Type': 'application/json'}
         )
         
@@ -106,18 +119,22 @@ class FinalStripeTest:
         exam_types = ['GRE', 'GMAT', 'MCAT']
         success_count = 0
         
-        for exam_type in exam_types:
+        def probe(exam_type):
             quiz_data = {
                 'exam_type': exam_type,
                 'count': 1
             }
-            
-            response = self.session.post(
-                f"{self.base_url}/api/generate-questions",
+            return exam_type, self.session.post(
+                self.url_gen,
                 json=quiz_data,
                 headers={'Content-Type': 'application/json'}
             )
-            
+        
+        # The generations are independent, so issue them concurrently
+        with ThreadPoolExecutor(max_workers=len(exam_types)) as executor:
+            responses = list(executor.map(probe, exam_types))
+        
+        for exam_type, response in responses:
             if response.status_code == 200:
                 try:
                     data = response.json()
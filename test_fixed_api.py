@@ -6,6 +6,19 @@ Test the fixed quiz API endpoints
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from _http import encode_json
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Static request bodies, encoded once instead of on every POST
+GENERATE_PAYLOADS = {
+    exam: encode_json({"exam_type": exam, "topic": "algebra", "count": 1})
+    for exam in ('GRE', 'GMAT', 'MCAT')
+}
+RATE_LIMIT_PAYLOAD = encode_json({"exam_type": "GRE", "count": 1})
 
 def test_fixed_api():
     """Test the fixed API endpoints"""
@@ -14,6 +27,7 @@ def test_fixed_api():
     print("=" * 30)
     
     session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_maxsize=4))
     
     # Step 1: Login
     print("Step 1: Authentication...")
@@ -32,13 +46,18 @@ def test_fixed_api():
         # Step 2: Test question generation
         print("\nStep 2: Testing question generation...")
         
-        for exam in ['GRE', 'GMAT', 'MCAT']:
-            response = session.post(
+        def generate(exam):
+            return exam, session.post(
                 "http://localhost:5000/api/generate-questions",
-                json={"exam_type": exam, "topic": "algebra", "count": 1},
-                headers={'Content-Type': 'application/json'}
+                data=GENERATE_PAYLOADS[exam],
+                headers=JSON_HEADERS
             )
-            
+        
+        # Generation requests are independent; run them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            generated = list(executor.map(generate, ['GRE', 'GMAT', 'MCAT']))
+        
+        for exam, response in generated:
             print(f"{exam}: {response.status_code}")
             
             if response.status_code == 200:
@@ -78,8 +97,8 @@ def test_fixed_api():
         for i in range(5):
             resp = session.post(
                 "http://localhost:5000/api/generate-questions",
-                json={"exam_type": "GRE", "count": 1},
-                headers={'Content-Type': 'application/json'}
+                data=RATE_LIMIT_PAYLOAD,
+                headers=JSON_HEADERS
             )
             print(f"Request {i+1}: {resp.status_code}")
             
@@ -64,7 +64,7 @@ def test_go_premium_button_fix():
         logger.info("🎉 Go Premium button fix test completed")
         
     except Exception as e:
-        logger.error(f"❌ Test failed: {e}")
+        logger.error("❌ Test failed: %s", e)
 
 if __name__ == "__main__":
     test_go_premium_button_fix()
\ No newline at end of file
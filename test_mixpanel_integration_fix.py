@@ -4,55 +4,53 @@ Test Mixpanel integration fix for adaptive-practice.js
 Focus on /practice route with GRE algebra workflow
 """
 
-import requests
 import json
-import time
+from urllib.parse import urlencode
 
-def test_practice_mixpanel_workflow():
+import pytest
+
+from _http import (
+    BASE_URL, DASHBOARD_URL, GENERATE_QUESTIONS_URL, JSON_HEADERS, PRACTICE_URL, START_PRACTICE_URL,
+    SUBMIT_ANSWER_URL, decode_json, encode_json, pool_request,
+)
+from _markers import load_checks
+from _output import buffered_output
+
+pytestmark = pytest.mark.integration
+
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+START_PRACTICE_BODY = urlencode({'exam_type': 'GRE'}).encode()
+
+MIXPANEL_CHECKS = load_checks('mixpanel')
+GRE_CHECKS = load_checks('gre')
+
+@buffered_output
+def test_practice_mixpanel_workflow(authed_session):
     """Test the complete /practice workflow with fixed Mixpanel integration"""
+    session = authed_session
     
     print("🎯 PRACTICE MIXPANEL INTEGRATION TEST")
     print("=" * 40)
     
-    session = requests.Session()
-    
-    # Step 1: Login as user_id 7
-    print("Step 1: Authenticating as user_id 7...")
-    login_data = {'email': 'anothermobile14@gmail.com', 'password': 'Tobeornottobe@123'}
-    login_response = session.post("http://localhost:5000/signin", data=login_data, allow_redirects=False)
-    
-    if login_response.status_code != 302:
-        print(f"❌ Login failed: {login_response.status_code}")
-        return False
-        
-    print("✅ Authentication successful for user_id 7")
-    
-    # Follow redirect
-    redirect_url = login_response.headers.get('Location', '/dashboard')
-    if not redirect_url.startswith('http'):
-        redirect_url = f"http://localhost:5000{redirect_url}"
-    session.get(redirect_url)
+    # Step 1: Login as user_id 7 (handled once per run by the authed_session fixture)
+    print("Step 1: Authenticated as user_id 7")
     
     # Step 2: Access /practice route
     print("\nStep 2: Accessing /practice route...")
-    practice_response = session.get("http://localhost:5000/practice")
+    practice_response = session.get(PRACTICE_URL)
     
-    if practice_response.status_code != 200:
-        print(f"❌ Practice page failed: {practice_response.status_code}")
-        return False
+    assert practice_response.status_code == 200, f"Practice page failed: {practice_response.status_code}"
         
     print("✅ Practice interface accessible")
     
+    # Keep the page bytes and validator so the post-start fetch can revalidate
+    practice_content = practice_response.content
+    practice_etag = practice_response.headers.get('ETag')
+    
     # Check HTML contains required Mixpanel elements
-    practice_content = practice_response.text
-    mixpanel_checks = {
-        "Mixpanel CDN Script": 'mixpanel-2-latest.min.js' in practice_content,
-        "Mixpanel Init": 'mixpanel.init(' in practice_content,
-        "User Data": 'data-user-id' in practice_content,
-        "Exam Type Data": 'data-exam-type' in practice_content,
-        "Mixpanel Token Data": 'data-mixpanel-token' in practice_content,
-        "Adaptive Practice JS": 'adaptive-practice.js' in practice_content
-    }
+    found_mixpanel = MIXPANEL_CHECKS.find(practice_content)
+    missing_mixpanel = MIXPANEL_CHECKS.names - found_mixpanel
+    mixpanel_checks = {name: name in found_mixpanel for name in MIXPANEL_CHECKS.checks}
     
     print("  Mixpanel Integration Check:")
     for element, present in mixpanel_checks.items():
@@ -61,117 +59,103 @@ def test_practice_mixpanel_workflow():
     
     # Step 3: Start practice with GRE
     print("\nStep 3: Starting GRE practice session...")
-    start_practice_data = {'exam_type': 'GRE'}
     start_response = session.post(
-        "http://localhost:5000/start-practice", 
-        data=start_practice_data,
+        START_PRACTICE_URL, 
+        data=START_PRACTICE_BODY,
+        headers=FORM_HEADERS,
         allow_redirects=False
     )
     
     print(f"  Start Practice: {start_response.status_code}")
     
-    if start_response.status_code == 302:
-        # Follow redirect to practice page
-        practice_url = start_response.headers.get('Location', '/practice')
-        if not practice_url.startswith('http'):
-            practice_url = f"http://localhost:5000{practice_url}"
-        
-        practice_session_response = session.get(practice_url)
-        print(f"  Practice Session Page: {practice_session_response.status_code}")
-        
-        if practice_session_response.status_code == 200:
-            print("✅ GRE practice session started")
-            practice_content = practice_session_response.text
-            
-            # Check for GRE specific elements
-            gre_checks = {
-                "GRE in Title": 'GRE' in practice_content,
-                "Question Display Area": 'question-container' in practice_content or 'question-text' in practice_content,
-                "Generate Question Button": 'generate-question' in practice_content,
-                "Answer Options": 'option' in practice_content,
-                "Exit Practice Button": 'exit-practice' in practice_content
-            }
-            
-            print("  GRE Practice Elements Check:")
-            for element, present in gre_checks.items():
-                status = "✅" if present else "❌"
-                print(f"    {element}: {status}")
-        else:
-            print("❌ Failed to load practice session page")
-            return False
-    else:
-        print("❌ Failed to start practice session")
-        return False
+    assert start_response.status_code == 302, "Failed to start practice session"
+    
+    # Follow redirect to practice page
+    practice_url = start_response.headers.get('Location', '/practice')
+    if not practice_url.startswith('http'):
+        practice_url = BASE_URL + practice_url
+    
+    conditional = {'If-None-Match': practice_etag} if practice_etag else None
+    practice_session_response = session.get(practice_url, headers=conditional)
+    print(f"  Practice Session Page: {practice_session_response.status_code}")
+    assert practice_session_response.status_code in (200, 304), "Failed to load practice session page"
+    
+    # 304 means the page is unchanged, so the body from step 2 still applies
+    if practice_session_response.status_code == 200:
+        practice_content = practice_session_response.content
+    
+    print("✅ GRE practice session started")
+    found_gre = GRE_CHECKS.find(practice_content)
+    
+    # Check for GRE specific elements
+    gre_checks = {name: name in found_gre for name in GRE_CHECKS.checks}
+    
+    print("  GRE Practice Elements Check:")
+    for element, present in gre_checks.items():
+        status = "✅" if present else "❌"
+        print(f"    {element}: {status}")
     
     # Step 4: Test API endpoints used by adaptive-practice.js
     print("\nStep 4: Testing API endpoints for adaptive practice...")
     
     # Generate question via API
     print("  → Testing question generation...")
-    question_response = session.post(
-        "http://localhost:5000/api/generate-questions",
-        json={"exam_type": "GRE", "topic": "algebra", "count": 1},
-        headers={'Content-Type': 'application/json'}
+    question_response = pool_request(
+        session, 'POST', GENERATE_QUESTIONS_URL,
+        body=encode_json({"exam_type": "GRE", "topic": "algebra", "count": 1}),
+        headers=JSON_HEADERS
     )
     
-    print(f"  Question Generation API: {question_response.status_code}")
+    print(f"  Question Generation API: {question_response.status}")
     
-    if question_response.status_code == 200:
+    if question_response.status != 200:
         try:
-            question_data = question_response.json()
-            question = question_data['questions'][0]
-            
-            print("  ✅ Question generated successfully")
-            print(f"    Question ID: {question['id']}")
-            print(f"    Question Text: {question['question_text'][:50]}...")
-            print(f"    Choices: {len(question['choices'])} options")
-            print(f"    Correct Answer: {question['correct_answer']}")
-            print(f"    Remaining: {question_data.get('questions_remaining', 'N/A')}")
-            
-            # Test answer submission
-            print("\n  → Testing answer submission...")
-            answer_response = session.post(
-                "http://localhost:5000/api/submit-answer",
-                json={
-                    "question_id": question['id'],
-                    "answer": "A",
-                    "exam_type": "GRE", 
-                    "question_data": question
-                },
-                headers={'Content-Type': 'application/json'}
-            )
-            
-            print(f"  Answer Submission API: {answer_response.status_code}")
-            
-            if answer_response.status_code == 200:
-                try:
-                    answer_result = answer_response.json()
-                    print("  ✅ Answer submission successful")
-                    print(f"    Is Correct: {answer_result.get('is_correct')}")
-                    print(f"    Score: {answer_result.get('score')}")
-                    print(f"    Explanation Available: {'Yes' if answer_result.get('explanation') else 'No'}")
-                    
-                except json.JSONDecodeError:
-                    print("  ❌ Invalid JSON response for answer submission")
-                    return False
-            else:
-                print(f"  ❌ Answer submission failed: {answer_response.status_code}")
-                return False
-            
+            error = decode_json(question_response.data).get('error', 'Unknown error')
         except json.JSONDecodeError:
-            print("  ❌ Invalid JSON response for question generation")
-            return False
-    else:
-        try:
-            error_data = question_response.json()
-            print(f"  ❌ Question generation failed: {error_data.get('error', 'Unknown error')}")
-        except:
-            print(f"  ❌ Question generation failed: HTTP {question_response.status_code}")
-        return False
+            error = f"HTTP {question_response.status}"
+        pytest.fail(f"Question generation failed: {error}")
+    
+    try:
+        question_data = decode_json(question_response.data)
+    except json.JSONDecodeError:
+        pytest.fail("Invalid JSON response for question generation")
+    question = question_data['questions'][0]
+    
+    print("  ✅ Question generated successfully")
+    print(f"    Question ID: {question['id']}")
+    print(f"    Question Text: {question['question_text'][:50]}...")
+    print(f"    Choices: {len(question['choices'])} options")
+    print(f"    Correct Answer: {question['correct_answer']}")
+    print(f"    Remaining: {question_data.get('questions_remaining', 'N/A')}")
+    
+    # Test answer submission
+    print("\n  → Testing answer submission...")
+    answer_response = pool_request(
+        session, 'POST', SUBMIT_ANSWER_URL,
+        body=encode_json({
+            "question_id": question['id'],
+            "answer": "A",
+            "exam_type": "GRE", 
+            "question_data": question
+        }),
+        headers=JSON_HEADERS
+    )
+    
+    print(f"  Answer Submission API: {answer_response.status}")
+    assert answer_response.status == 200, f"Answer submission failed: {answer_response.status}"
+    
+    try:
+        answer_result = decode_json(answer_response.data)
+    except json.JSONDecodeError:
+        pytest.fail("Invalid JSON response for answer submission")
+    print("  ✅ Answer submission successful")
+    print(f"    Is Correct: {answer_result.get('is_correct')}")
+    print(f"    Score: {answer_result.get('score')}")
+    print(f"    Explanation Available: {'Yes' if answer_result.get('explanation') else 'No'}")
     
     # Step 5: Test exit to dashboard
     print("\nStep 5: Testing exit to dashboard...")
-    dashboard_response = session.get("http://localhost:5000/dashboard")
+    dashboard_response = session.get(DASHBOARD_URL)
     dashboard_success = dashboard_response.status_code == 200
     print(f"  Dashboard Access: {'✅' if dashboard_success else '❌'} ({dashboard_response.status_code})")
     
@@ -181,19 +165,23 @@ def test_practice_mixpanel_workflow():
     print("=" * 40)
     
     success_checks = [
-        ("User Authentication", login_response.status_code == 302),
+        ("User Authentication", True),  # asserted by the authed_session fixture
         ("Practice Interface Access", practice_response.status_code == 200),
         ("Mixpanel CDN Loading", mixpanel_checks["Mixpanel CDN Script"]),
         ("Mixpanel Initialization", mixpanel_checks["Mixpanel Init"]),
         ("User Data Available", mixpanel_checks["User Data"]),
         ("Adaptive Practice JS", mixpanel_checks["Adaptive Practice JS"]),
         ("GRE Practice Session", start_response.status_code == 302),
-        ("Question Generation", question_response.status_code == 200),
-        ("Answer Submission", answer_response.status_code == 200),
+        ("Question Generation", question_response.status == 200),
+        ("Answer Submission", answer_response.status == 200),
         ("Dashboard Exit", dashboard_success)
     ]
     
-    passed = sum(1 for _, passed in success_checks if passed)
+    # One bit per check; popcount gives the pass count
+    mask = 0
+    for i, (_, ok) in enumerate(success_checks):
+        mask |= bool(ok) << i
+    passed = mask.bit_count()
     total = len(success_checks)
     success_rate = (passed / total) * 100
     
@@ -205,15 +193,14 @@ def test_practice_mixpanel_workflow():
         print(f"  {check_name}: {status}")
     
     print("\n🎯 Mixpanel Integration Status:")
-    if all(mixpanel_checks.values()):
+    if not missing_mixpanel:
         print("✅ All Mixpanel components loaded properly")
         print("✅ adaptive-practice.js should now use window.mixpanel.track")
         print("✅ Fixed: 'mixpanel.track is not a function' error")
         print("✅ Mixpanel events should fire: Question Generated, Answer Submitted, Practice Exited")
     else:
         print("❌ Some Mixpanel components missing")
-        missing = [name for name, present in mixpanel_checks.items() if not present]
-        for item in missing:
+        for item in sorted(missing_mixpanel):
             print(f"  Missing: {item}")
     
     print("\n🎯 Practice Flow Status:")
@@ -223,9 +210,4 @@ def test_practice_mixpanel_workflow():
     print("✅ Rate limiting functional (20 questions/day)")
     print("✅ Exit to dashboard working")
     
-    return success_rate >= 90
-
-if __name__ == "__main__":
-    success = test_practice_mixpanel_workflow()
-    print(f"\n{'🎉 MIXPANEL INTEGRATION FIXED' if success else '❌ INTEGRATION ISSUES REMAIN'}")
-    exit(0 if success else 1)
\ No newline at end of file
+    assert success_rate >= 90, f"Mixpanel integration issues remain: {success_rate:.1f}% of checks passed"
@@ -4,29 +4,129 @@ Simplified Performance and Mobile Test for PrepForge
 Tests critical functionality and performance optimizations
 """
 
-import requests
+import asyncio
+import gzip
+import socket
 import time
 import json
+from collections import namedtuple
 
-def test_performance_optimizations():
-    """Test that performance optimizations are working"""
+import aiohttp
+
+from _http import BASE_URL, HEALTH_URL, SESSION
+from _markers import load_checks
+from _output import buffered_output
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Only advertise encodings we can undo, so reported sizes stay exact
+ACCEPT_ENCODING = "gzip, br" if brotli else "gzip"
+
+# A dead server should fail on connect in a second rather than eat the
+# whole budget; a slow one still gets five seconds between reads
+CONNECT_TIMEOUT = 1.0
+READ_TIMEOUT = 5.0
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+
+# body is decoded; wire_size and encoding describe what was transferred
+Probe = namedtuple('Probe', 'status elapsed_ms body wire_size encoding')
+
+def _decode_body(body, encoding):
+    """Undo the content encoding that aiohttp was told to leave in place"""
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'br':
+        return brotli.decompress(body)
+    return body
+
+async def _probe(http, url):
+    """GET url, returning (url, Probe); Probe.status is None on error"""
+    start_ns = time.perf_counter_ns()
+    try:
+        async with http.get(url) as response:
+            wire = await response.read()
+            elapsed_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+            encoding = response.headers.get('Content-Encoding')
+            return url, Probe(response.status, elapsed_ms, _decode_body(wire, encoding), len(wire), encoding)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return url, Probe(None, (time.perf_counter_ns() - start_ns) / 1_000_000, b'', 0, None)
+
+async def _probe_all(urls, warmup_url=None):
+    """Probe every URL concurrently; results come back in the order given.
+
+    With warmup_url, one untimed GET goes out first so the connection
+    setup and the server's first-request work aren't charged to a probe.
+    """
+    # Resolve localhost once for the whole burst (ttl_dns_cache=None keeps
+    # the answer) and only over IPv4, where the app listens on 0.0.0.0
+    connector = aiohttp.TCPConnector(
+        limit=32, keepalive_timeout=30, ttl_dns_cache=None, family=socket.AF_INET
+    )
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=PROBE_TIMEOUT,
+        auto_decompress=False,
+        headers={'Accept-Encoding': ACCEPT_ENCODING}
+    ) as http:
+        if warmup_url:
+            await _probe(http, warmup_url)
+        return await asyncio.gather(*(_probe(http, url) for url in urls))
+
+MOBILE_FEATURES = load_checks('mobile_features')
+MOBILE_LAYOUT_CHECKS = load_checks('mobile_layout')
+PERF_FEATURES = load_checks('perf_features')
+
+# Body bytes of 200 responses by URL, shared by the tests in this module
+_CONTENT_CACHE = {}
+
+def _get_content(url, session=SESSION):
+    """Body of url, fetched at most once per run; None unless it answered 200"""
+    if url not in _CONTENT_CACHE:
+        response = session.get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        if response.status_code != 200:
+            return None
+        _CONTENT_CACHE[url] = response.content
+    return _CONTENT_CACHE[url]
+
+def _keepalive_check(url, rounds=3, session=SESSION):
+    """GET url rounds times in a row; return (new connections opened, total ms).
+
+    With keep-alive honoured only the first request may dial, so anything
+    above one connection means the server is closing sockets after each
+    response (gunicorn's sync worker does this, for instance).
+    """
+    pool = session.get_adapter(url).poolmanager.connection_from_url(url)
+    opened = pool.num_connections
+    start_ns = time.perf_counter_ns()
+    for _ in range(rounds):
+        session.get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)).content
+    return pool.num_connections - opened, (time.perf_counter_ns() - start_ns) / 1_000_000
+
+@buffered_output
+def test_performance_optimizations(warmup=True):
+    """Test that performance optimizations are working.
+
+    Load times are steady-state by default; pass warmup=False to include
+    the cold first request in them.
+    """
     print("🎯 TESTING PERFORMANCE OPTIMIZATIONS")
     print("=" * 50)
     
-    session = requests.Session()
-    base_url = "http://localhost:5000"
+    base_url = BASE_URL
     
     results = {
         'pages_accessible': 0,
         'css_files_accessible': 0,
         'js_files_accessible': 0,
         'mobile_css_present': False,
-        'performance_features': 0
+        'performance_features': 0,
+        'compressed_assets': 0,
+        'keepalive_reused': False
     }
     
-    # Test 1: Page Accessibility and Load Times
-    print("\n📄 Testing page accessibility and load times...")
-    
     pages_to_test = [
         "/",           # Landing page
         "/dashboard",  # Dashboard (may redirect to login)
@@ -35,30 +135,6 @@ def test_performance_optimizations():
         "/signin"      # Sign in page
     ]
     
-    for page in pages_to_test:
-        start_time = time.time()
-        try:
-            response = session.get(f"{base_url}{page}", timeout=10)
-            load_time = (time.time() - start_time) * 1000
-            
-            if response.status_code in [200, 302]:  # Success or redirect
-                results['pages_accessible'] += 1
-                status = "✅ ACCESSIBLE"
-                if load_time < 2000:
-                    status += f" (Load: {load_time:.0f}ms)"
-                else:
-                    status += f" (SLOW: {load_time:.0f}ms)"
-            else:
-                status = f"❌ ERROR {response.status_code}"
-                
-            print(f"  {page}: {status}")
-            
-        except Exception as e:
-            print(f"  {page}: ❌ TIMEOUT/ERROR")
-    
-    # Test 2: Critical CSS and JS Files
-    print("\n🎨 Testing optimized assets...")
-    
     critical_assets = [
         "/static/css/mobile-first.css",
         "/static/css/performance.css", 
@@ -67,96 +143,122 @@ def test_performance_optimizations():
         "/static/js/mobile-optimization.js"
     ]
     
+    # The probes are independent, so fire them all at once and report after;
+    # mobile-first.css and /signin are already in the lists above
+    probes = dict(asyncio.run(_probe_all(
+        dict.fromkeys(f"{base_url}{path}" for path in pages_to_test + critical_assets),
+        warmup_url=f"{base_url}/" if warmup else None
+    )))
+    
+    # Test 1: Page Accessibility and Load Times
+    print("\n📄 Testing page accessibility and load times...")
+    
+    for page in pages_to_test:
+        probe = probes[f"{base_url}{page}"]
+        status_code, load_time = probe.status, probe.elapsed_ms
+        if status_code is None:
+            print(f"  {page}: ❌ TIMEOUT/ERROR")
+            continue
+        
+        if status_code in [200, 302]:  # Success or redirect
+            results['pages_accessible'] += 1
+            status = "✅ ACCESSIBLE"
+            if load_time < 2000:
+                status += f" (Load: {load_time:.0f}ms)"
+            else:
+                status += f" (SLOW: {load_time:.0f}ms)"
+        else:
+            status = f"❌ ERROR {status_code}"
+            
+        print(f"  {page}: {status}")
+    
+    # Test 2: Critical CSS and JS Files
+    print("\n🎨 Testing optimized assets...")
+    
     for asset in critical_assets:
-        try:
-            response = session.get(f"{base_url}{asset}", timeout=5)
-            if response.status_code == 200:
-                results['css_files_accessible'] += 1
-                size_kb = len(response.content) / 1024
-                print(f"  {asset}: ✅ ({size_kb:.1f}KB)")
+        probe = probes[f"{base_url}{asset}"]
+        if probe.status == 200:
+            results['css_files_accessible'] += 1
+            raw_kb = len(probe.body) / 1024
+            if probe.encoding:
+                results['compressed_assets'] += 1
+                wire_kb = probe.wire_size / 1024
+                print(f"  {asset}: ✅ ({raw_kb:.1f}KB -> {wire_kb:.1f}KB {probe.encoding})")
             else:
-                print(f"  {asset}: ❌ {response.status_code}")
-        except Exception as e:
+                print(f"  {asset}: ✅ ({raw_kb:.1f}KB, uncompressed)")
+        elif probe.status is None:
             print(f"  {asset}: ❌ ERROR")
+        else:
+            print(f"  {asset}: ❌ {probe.status}")
     
     # Test 3: Mobile-First CSS Content
     print("\n📱 Testing mobile-first responsive design...")
     
-    try:
-        mobile_css = session.get(f"{base_url}/static/css/mobile-first.css")
-        if mobile_css.status_code == 200:
-            content = mobile_css.text
-            
-            mobile_features = [
-                ("360px viewport", "360px" in content),
-                ("Mobile-first queries", "@media (min-width:" in content),
-                ("Touch target sizing", "min-height: 44px" in content or "44px" in content),
-                ("Container responsiveness", ".container" in content),
-                ("Option optimization", ".option" in content),
-                ("Button optimization", ".btn" in content)
-            ]
-            
-            mobile_score = 0
-            for feature_name, present in mobile_features:
-                status = "✅" if present else "❌"
-                print(f"  {feature_name}: {status}")
-                if present:
-                    mobile_score += 1
-                    
-            results['mobile_css_present'] = mobile_score >= 4
-            print(f"  Mobile features: {mobile_score}/{len(mobile_features)}")
-            
-        else:
-            print(f"  ❌ Mobile CSS not accessible")
-            
-    except Exception as e:
-        print(f"  ❌ Error testing mobile CSS")
+    mobile_css_url = f"{base_url}/static/css/mobile-first.css"
+    probe = probes[mobile_css_url]
+    if probe.status == 200:
+        _CONTENT_CACHE.setdefault(mobile_css_url, probe.body)
+        
+        # One regex pass over the stylesheet answers every check
+        found = MOBILE_FEATURES.find(probe.body)
+        mobile_features = [(name, name in found) for name in MOBILE_FEATURES.checks]
+        
+        mobile_score = 0
+        for feature_name, present in mobile_features:
+            status = "✅" if present else "❌"
+            print(f"  {feature_name}: {status}")
+            if present:
+                mobile_score += 1
+                
+        results['mobile_css_present'] = mobile_score >= 4
+        print(f"  Mobile features: {mobile_score}/{len(mobile_features)}")
+        
+    else:
+        print(f"  ❌ Mobile CSS not accessible")
     
     # Test 4: Performance Features in HTML
     print("\n⚡ Testing performance features...")
     
-    try:
-        signin_page = session.get(f"{base_url}/signin")
-        if signin_page.status_code == 200:
-            content = signin_page.text
-            
-            perf_features = [
-                ("Critical CSS inlined", "Critical CSS" in content or "critical-content" in content),
-                ("Preload resources", "rel=\"preload\"" in content),
-                ("Deferred scripts", "defer" in content),
-                ("Meta viewport", "width=device-width" in content),
-                ("Meta description", "name=\"description\"" in content),
-                ("Performance scripts", "performance.js" in content)
-            ]
-            
-            for feature_name, present in perf_features:
-                status = "✅" if present else "❌"
-                print(f"  {feature_name}: {status}")
-                if present:
-                    results['performance_features'] += 1
-                    
-        else:
-            print(f"  ❌ Could not access signin page for performance testing")
-            
-    except Exception as e:
-        print(f"  ❌ Error testing performance features")
+    probe = probes[f"{base_url}/signin"]
+    if probe.status == 200:
+        # Single forward pass over the page bytes for all six features
+        found = PERF_FEATURES.find(probe.body)
+        perf_features = [(name, name in found) for name in PERF_FEATURES.checks]
+        
+        for feature_name, present in perf_features:
+            status = "✅" if present else "❌"
+            print(f"  {feature_name}: {status}")
+            if present:
+                results['performance_features'] += 1
+                
+    else:
+        print(f"  ❌ Could not access signin page for performance testing")
     
     # Test 5: API Response Performance (Basic)
     print("\n🚀 Testing API response performance...")
     
+    # Reuse the /signin probe from Test 1 rather than fetching it a third time;
+    # it ran alongside the other probes, so this is a loaded-server figure
+    signin_probe = probes[f"{base_url}/signin"]
+    api_time = signin_probe.elapsed_ms
+    
+    if signin_probe.status is None:
+        print(f"  ❌ Error testing API performance")
+    elif signin_probe.status == 200 and api_time < 1000:
+        print(f"  Page response time: ✅ {api_time:.0f}ms")
+    else:
+        print(f"  Page response time: ⚠️ {api_time:.0f}ms")
+    
+    # Test 6: Connection Keep-Alive
+    print("\n🔁 Testing connection keep-alive...")
+    
     try:
-        # Test a simple API endpoint
-        start_time = time.time()
-        api_response = session.get(f"{base_url}/signin")  # Simple page load
-        api_time = (time.time() - start_time) * 1000
-        
-        if api_response.status_code == 200 and api_time < 1000:
-            print(f"  Page response time: ✅ {api_time:.0f}ms")
-        else:
-            print(f"  Page response time: ⚠️ {api_time:.0f}ms")
-            
+        new_connections, keepalive_ms = _keepalive_check(HEALTH_URL)
+        results['keepalive_reused'] = new_connections <= 1
+        status = "✅ reused" if results['keepalive_reused'] else f"⚠️ {new_connections} new connections"
+        print(f"  3 sequential requests: {status} ({keepalive_ms:.0f}ms)")
     except Exception as e:
-        print(f"  ❌ Error testing API performance")
+        print(f"  ❌ Error testing keep-alive")
     
     # Summary
     print("\n" + "=" * 50)
@@ -170,6 +272,8 @@ def test_performance_optimizations():
     print(f"🎨 Asset Accessibility: {results['css_files_accessible']}/{total_assets}")
     print(f"📱 Mobile Responsiveness: {'✅' if results['mobile_css_present'] else '❌'}")
     print(f"⚡ Performance Features: {results['performance_features']}/6")
+    print(f"🗜️ Compressed Assets: {results['compressed_assets']}/{total_assets}")
+    print(f"🔁 Keep-Alive Reuse: {'✅' if results['keepalive_reused'] else '⚠️'}")
     
     # Calculate overall success rate
     max_possible = total_pages + total_assets + 1 + 6  # pages + assets + mobile + perf features
@@ -204,31 +308,23 @@ def test_performance_optimizations():
     
     return target_met
 
-def test_mobile_layout_indicators():
+@buffered_output
+def test_mobile_layout_indicators(session=SESSION):
     """Test specific mobile layout indicators"""
     print("\n📱 MOBILE LAYOUT VALIDATION")
     print("=" * 30)
     
-    session = requests.Session()
-    base_url = "http://localhost:5000"
+    base_url = BASE_URL
     
     try:
-        # Get the mobile CSS
-        mobile_css_response = session.get(f"{base_url}/static/css/mobile-first.css")
+        # Get the mobile CSS (already cached if the optimization test ran)
+        css_content = _get_content(f"{base_url}/static/css/mobile-first.css", session)
         
-        if mobile_css_response.status_code == 200:
-            css_content = mobile_css_response.text
+        if css_content is not None:
             
             # Key mobile layout indicators
-            mobile_checks = [
-                ("Base mobile width (360px)", "360px" in css_content),
-                ("Progressive enhancement", "@media (min-width:" in css_content),
-                ("Touch-friendly buttons", "44px" in css_content),
-                ("Responsive containers", ".container" in css_content),
-                ("Mobile navigation", "mobile-nav" in css_content or "nav-toggle" in css_content),
-                ("Flexible layouts", "flex" in css_content),
-                ("Grid responsiveness", "grid-template-columns" in css_content)
-            ]
+            found = MOBILE_LAYOUT_CHECKS.find(css_content)
+            mobile_checks = [(name, name in found) for name in MOBILE_LAYOUT_CHECKS.checks]
             
             passed = sum(1 for _, check in mobile_checks if check)
             total = len(mobile_checks)
@@ -254,7 +350,8 @@ def main():
     print("🎯 Target: Lighthouse scores ≥90, <2s load times, mobile-first design")
     print("=" * 70)
     
-    # Run performance tests
+    # Run performance tests first: they fill the mobile-first.css cache, so
+    # the mobile test below finishes without a request of its own
     perf_success = test_performance_optimizations()
     
     # Run mobile tests  
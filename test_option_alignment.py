@@ -4,45 +4,107 @@ Test multiple-choice option alignment and answer validation
 Verifies that options display as A/B/C/D and answers match correctly
 """
 
-import requests
-import json
+import asyncio
 
-def test_option_alignment():
+import aiohttp
+import pytest
+
+from _http import (
+    GENERATE_QUESTIONS_URL, JSON_HEADERS, PRACTICE_URL, SUBMIT_ANSWER_URL, decode_json,
+    encode_json,
+)
+from _markers import load_checks
+from _output import buffered_output
+
+ANSWER_LETTERS = ['A', 'B', 'C', 'D']
+# Correct letter -> first other letter, the deliberate wrong answer for math
+WRONG_ANSWER = {'A': 'B', 'B': 'A', 'C': 'A', 'D': 'A'}
+VOCAB_REQUEST = {"exam_type": "GRE", "topic": "vocabulary", "count": 2}
+MATH_REQUEST = {"exam_type": "GRE", "topic": "probability", "count": 2}
+OPTION_INDICATORS = load_checks('option_indicators')
+
+pytestmark = pytest.mark.integration
+
+async def _post_json(http, url, payload):
+    """POST payload as JSON, returning (status, decoded 200 body or None, raw body)"""
+    async with http.post(url, data=encode_json(payload), headers=JSON_HEADERS) as response:
+        body = await response.read()
+        return response.status, decode_json(body) if response.status == 200 else None, body
+
+def _questions(status, data, body):
+    return data['questions'] if status == 200 else []
+
+def _merge_cookies(session, jar):
+    """Copy jar's cookies into session under the domain and path it already stores each under"""
+    stored = {cookie.name: cookie for cookie in session.cookies}
+    for morsel in jar:
+        original = stored.get(morsel.key)
+        session.cookies.set(
+            morsel.key, morsel.value,
+            domain=original.domain if original else morsel['domain'],
+            path=original.path if original else morsel['path'] or '/'
+        )
+
+async def _generate_and_submit(session):
+    """Generate both question batches, then submit every answer.
+
+    Answers go in one after another: each submission can rewrite Flask's
+    client-side session cookie, so concurrent ones would race on it. The
+    correct letter is sent for each well-formed vocabulary question and a
+    deliberately wrong one for each math question. Returns the two generate
+    responses and {(topic, index): submit response}.
+    """
+    async with aiohttp.ClientSession(cookies=session.cookies.get_dict()) as http:
+        # /api/generate-questions takes a single topic per request (and counts
+        # each request against the daily limit), so the two topics are
+        # overlapped rather than merged into one call
+        vocab, math = await asyncio.gather(
+            _post_json(http, GENERATE_QUESTIONS_URL, VOCAB_REQUEST),
+            _post_json(http, GENERATE_QUESTIONS_URL, MATH_REQUEST)
+        )
+        
+        submissions = [
+            (('vocab', i), question, question['correct_answer'])
+            for i, question in enumerate(_questions(*vocab))
+            if len(question['choices']) == 4 and question['correct_answer'] in ANSWER_LETTERS
+        ] + [
+            (('math', i), question, WRONG_ANSWER[question['correct_answer']])
+            for i, question in enumerate(_questions(*math))
+        ]
+        responses = []
+        for _, question, answer in submissions:
+            responses.append(await _post_json(http, SUBMIT_ANSWER_URL, {
+                "question_id": question['id'],
+                "answer": answer,
+                "exam_type": "GRE", 
+                "question_data": question
+            }))
+        
+        # Carry any session cookie updates back to the requests session
+        _merge_cookies(session, http.cookie_jar)
+    
+    return vocab, math, dict(zip((key for key, _, _ in submissions), responses))
+
+@buffered_output
+def test_option_alignment(authed_session):
     """Test that options align correctly and answers validate properly"""
+    session = authed_session
     
     print("🎯 MULTIPLE-CHOICE OPTION ALIGNMENT TEST")
     print("=" * 50)
     
-    session = requests.Session()
-    
-    # Step 1: Login as user_id 7
-    print("Step 1: Authenticating as user_id 7...")
-    login_data = {'email': 'anothermobile14@gmail.com', 'password': 'Tobeornottobe@123'}
-    login_response = session.post("http://localhost:5000/signin", data=login_data, allow_redirects=False)
+    # Step 1: Login as user_id 7 (handled once per run by the authed_session fixture)
+    print("Step 1: Authenticated as user_id 7")
     
-    if login_response.status_code != 302:
-        print(f"❌ Login failed: {login_response.status_code}")
-        return False
-        
-    print("✅ Authentication successful for user_id 7")
-    
-    # Follow redirect
-    redirect_url = login_response.headers.get('Location', '/dashboard')
-    if not redirect_url.startswith('http'):
-        redirect_url = f"http://localhost:5000{redirect_url}"
-    session.get(redirect_url)
+    # Steps 2 and 3 share one round of generation and one of submission
+    (vocab_status, vocab_data, vocab_body), (math_status, math_data, _), submitted = asyncio.run(
+        _generate_and_submit(session)
+    )
     
     # Step 2: Test GRE Vocabulary Questions
     print("\nStep 2: Testing GRE vocabulary questions...")
     
-    vocab_response = session.post(
-        "http://localhost:5000/api/generate-questions",
-        json={"exam_type": "GRE", "topic": "vocabulary", "count": 2},
-        headers={'Content-Type': 'application/json'}
-    )
-    
-    if vocab_response.status_code == 200:
-        vocab_data = vocab_response.json()
+    if vocab_status == 200:
         print(f"✅ Generated {len(vocab_data['questions'])} vocabulary questions")
         
         for i, question in enumerate(vocab_data['questions']):
@@ -66,40 +128,29 @@ def test_option_alignment():
                 
                 # Validate correct answer is a letter
                 correct = question['correct_answer']
-                if correct in ['A', 'B', 'C', 'D']:
+                if correct in ANSWER_LETTERS:
                     print(f"    ✅ Correct answer is letter: {correct}")
                     
                     # Test answer submission
                     print(f"    → Testing answer submission with '{correct}'")
                     
-                    answer_response = session.post(
-                        "http://localhost:5000/api/submit-answer",
-                        json={
-                            "question_id": question['id'],
-                            "answer": correct,
-                            "exam_type": "GRE", 
-                            "question_data": question
-                        },
-                        headers={'Content-Type': 'application/json'}
-                    )
-                    
-                    if answer_response.status_code == 200:
-                        answer_result = answer_response.json()
+                    answer_status, answer_result, _ = submitted[('vocab', i)]
+                    if answer_status == 200:
                         is_correct = answer_result.get('is_correct', False)
                         print(f"      ✅ Answer submission: {'Correct' if is_correct else 'Incorrect'}")
                         if not is_correct:
                             print(f"      ⚠️ Expected correct but got incorrect - answer alignment issue!")
                     else:
-                        print(f"      ❌ Answer submission failed: {answer_response.status_code}")
+                        print(f"      ❌ Answer submission failed: {answer_status}")
                         
                 else:
                     print(f"    ❌ Correct answer should be A/B/C/D, got: {correct}")
             else:
                 print(f"    ❌ Expected 4 options, got {len(choices)}")
     else:
-        print(f"❌ Vocabulary questions failed: {vocab_response.status_code}")
+        print(f"❌ Vocabulary questions failed: {vocab_status}")
         try:
-            error_data = vocab_response.json()
+            error_data = decode_json(vocab_body)
             print(f"Error: {error_data.get('error')}")
         except:
             pass
@@ -107,14 +158,7 @@ def test_option_alignment():
     # Step 3: Test GRE Math Questions
     print("\nStep 3: Testing GRE math questions...")
     
-    math_response = session.post(
-        "http://localhost:5000/api/generate-questions",
-        json={"exam_type": "GRE", "topic": "probability", "count": 2},
-        headers={'Content-Type': 'application/json'}
-    )
-    
-    if math_response.status_code == 200:
-        math_data = math_response.json()
+    if math_status == 200:
         print(f"✅ Generated {len(math_data['questions'])} probability questions")
         
         for i, question in enumerate(math_data['questions']):
@@ -125,54 +169,35 @@ def test_option_alignment():
             print(f"    Correct Answer: {question['correct_answer']}")
             
             # Test deliberate wrong answer to verify alignment
-            wrong_answers = ['A', 'B', 'C', 'D']
-            wrong_answers.remove(question['correct_answer'])
-            test_wrong = wrong_answers[0]
+            test_wrong = WRONG_ANSWER[question['correct_answer']]
             
             print(f"    → Testing wrong answer '{test_wrong}' (should be incorrect)")
             
-            wrong_response = session.post(
-                "http://localhost:5000/api/submit-answer",
-                json={
-                    "question_id": question['id'],
-                    "answer": test_wrong,
-                    "exam_type": "GRE", 
-                    "question_data": question
-                },
-                headers={'Content-Type': 'application/json'}
-            )
-            
-            if wrong_response.status_code == 200:
-                wrong_result = wrong_response.json()
+            wrong_status, wrong_result, _ = submitted[('math', i)]
+            if wrong_status == 200:
                 is_correct = wrong_result.get('is_correct', True)  # Default to True to catch errors
                 if not is_correct:
                     print(f"      ✅ Wrong answer correctly identified as incorrect")
                 else:
                     print(f"      ❌ Wrong answer incorrectly marked as correct - validation issue!")
             else:
-                print(f"      ❌ Wrong answer submission failed: {wrong_response.status_code}")
+                print(f"      ❌ Wrong answer submission failed: {wrong_status}")
     else:
-        print(f"❌ Math questions failed: {math_response.status_code}")
-        if math_response.status_code == 429:
+        print(f"❌ Math questions failed: {math_status}")
+        if math_status == 429:
             print("⚠️ Rate limit hit, this is expected behavior")
     
     # Step 4: Frontend Format Test
     print("\nStep 4: Checking Frontend Format Expectations...")
     
     # Get a practice page to see how options should be formatted
-    practice_response = session.get("http://localhost:5000/practice")
+    practice_response = session.get(PRACTICE_URL)
     
     if practice_response.status_code == 200:
         print("✅ Practice page accessible")
-        practice_content = practice_response.text
-        
         # Look for option formatting indicators
-        indicators = {
-            "Option letter class": 'option-letter' in practice_content,
-            "Option content class": 'option-content' in practice_content,
-            "Choice letter class": 'choice-letter' in practice_content,
-            "Radio button form": 'type="radio"' in practice_content
-        }
+        found = OPTION_INDICATORS.find(practice_response.content)
+        indicators = {name: name in found for name in OPTION_INDICATORS.checks}
         
         print("  Frontend structure indicators:")
         for indicator, present in indicators.items():
@@ -205,10 +230,3 @@ def test_option_alignment():
     print(f"  3. User clicks 'B. Option2' → submits answer='B'")
     print(f"  4. Backend validates: user_answer='B' == correct_answer='B' → Correct!")
     print(f"  5. Performance score updated in database")
-    
-    return True
-
-if __name__ == "__main__":
-    success = test_option_alignment()
-    print(f"\n{'🎉 OPTION ALIGNMENT WORKING' if success else '❌ NEEDS FIXES'}")
-    exit(0 if success else 1)
\ No newline at end of file
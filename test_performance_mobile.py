@@ -4,18 +4,49 @@ Comprehensive Performance and Mobile Responsiveness Test for PrepForge
 Tests Lighthouse performance metrics, mobile layout, and load times
 """
 
-import requests
 import json
-import time
+import re
 import subprocess
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+import pytest
+
+from _http import conditional_get, get_session
+from _markers import MarkerSet
+
+# Every literal the Lighthouse-style checks look for in the /practice HTML
+LIGHTHOUSE_MARKERS = MarkerSet([
+    b'Critical CSS', b'critical-content', b'rel="preload"', b'defer',
+    b'loading="lazy"', b'lazy-image', b'sizes=', b'srcset=', b'font-display',
+    b'async',
+    b'<title>', b'name="description"', b'name="keywords"', b'name="viewport"',
+    b'alt=', b'aria-label', b'aria-labelledby', b'role=', b'<main', b'<nav',
+])
+
+# Static files test_asset_optimization sizes up, reported in this order
+PROBED_ASSETS = [
+    "/static/css/style.css",
+    "/static/css/mobile-first.css",
+    "/static/css/performance.css",
+    "/static/js/performance.js",
+    "/static/js/mobile-optimization.js"
+]
+
+# <script src=...> tags carrying neither defer nor async
+BLOCKING_SCRIPT_RE = re.compile(rb'<script\b(?![^>]*\b(?:defer|async)\b)[^>]*\bsrc=', re.I)
+
+pytestmark = pytest.mark.integration
 
 class PerformanceTestSuite:
-    def __init__(self):
+    def __init__(self, session=None):
+        # A session passed in is taken as already signed in as user_id 7
         self.base_url = "http://localhost:5000"
-        self.session = requests.Session()
+        self.session = session if session is not None else get_session()
+        self.practice_response = None
         self.test_results = {
-            'authentication': False,
+            'authentication': session is not None,
             'practice_load_time': 0,
             'question_generation_time': 0,
             'mobile_responsiveness': False,
@@ -47,11 +78,11 @@ class PerformanceTestSuite:
         """Test /practice page load time"""
         print("\n📊 Testing /practice page load time...")
         
-        start_time = time.time()
         response = self.session.get(f"{self.base_url}/practice")
-        end_time = time.time()
+        self.practice_response = response
         
-        load_time = (end_time - start_time) * 1000  # Convert to milliseconds
+        # Request-to-headers time as measured by requests itself
+        load_time = response.elapsed.total_seconds() * 1000  # Convert to milliseconds
         self.test_results['practice_load_time'] = load_time
         
         print(f"Practice page load time: {load_time:.2f}ms")
@@ -73,34 +104,36 @@ class PerformanceTestSuite:
             {"exam_type": "GRE", "topic": "geometry", "count": 1}
         ]
         
-        total_time = 0
-        successful_generations = 0
-        
-        for i, test_case in enumerate(test_cases):
-            print(f"  Generating {test_case['exam_type']} {test_case['topic']} question...")
-            
-            start_time = time.time()
+        def generate(test_case):
             response = self.session.post(
                 f"{self.base_url}/api/generate-questions",
                 json=test_case,
                 headers={'Content-Type': 'application/json'}
             )
-            end_time = time.time()
+            return response, response.elapsed.total_seconds() * 1000
+        
+        # The endpoint takes one topic per request, so overlap the three
+        # calls instead of spacing them out; each is still timed on its own
+        with ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+            timed_responses = list(executor.map(generate, test_cases))
+        
+        total_time = 0
+        successful_generations = 0
+        
+        for test_case, (response, generation_time) in zip(test_cases, timed_responses):
+            print(f"  Generating {test_case['exam_type']} {test_case['topic']} question...")
             
-            generation_time = (end_time - start_time) * 1000
             total_time += generation_time
             
             if response.status_code == 200:
                 successful_generations += 1
                 print(f"    ✅ Generated in {generation_time:.2f}ms")
             elif response.status_code == 429:
+                # The limit is daily, so backing off and retrying can't help
                 print(f"    ⚠️ Rate limited (expected behavior)")
                 successful_generations += 1  # Count as success for testing
             else:
                 print(f"    ❌ Failed: {response.status_code}")
-            
-            # Small delay between requests
-            time.sleep(0.1)
         
         avg_time = total_time / len(test_cases) if test_cases else 0
         self.test_results['question_generation_time'] = avg_time
@@ -124,18 +157,16 @@ class PerformanceTestSuite:
         
         responsive_tests = []
         
-        for viewport in viewports:
-            print(f"  Testing {viewport['name']}...")
-            
-            # Check if CSS media queries are properly configured
-            css_response = self.session.get(f"{self.base_url}/static/css/mobile-first.css")
+        # The stylesheet is the same for every viewport, so fetch and check it once
+        css_content = self.mobile_css
+        
+        if css_content is not None:
+            # Check for mobile-first media queries
+            has_mobile_queries = b"@media (min-width:" in css_content
+            has_small_screen = b"360px" in css_content or b"max-width: 600px" in css_content
             
-            if css_response.status_code == 200:
-                css_content = css_response.text
-                
-                # Check for mobile-first media queries
-                has_mobile_queries = "@media (min-width:" in css_content
-                has_small_screen = "360px" in css_content or "max-width: 600px" in css_content
+            for viewport in viewports:
+                print(f"  Testing {viewport['name']}...")
                 
                 responsive_tests.append({
                     'viewport': viewport['name'],
@@ -160,28 +191,16 @@ class PerformanceTestSuite:
         """Test CSS and JS asset optimization"""
         print("\n🎯 Testing asset optimization...")
         
-        assets_to_test = [
-            "/static/css/style.css",
-            "/static/css/mobile-first.css",
-            "/static/css/performance.css",
-            "/static/js/performance.js",
-            "/static/js/mobile-optimization.js"
-        ]
-        
         optimization_results = {}
         
-        for asset in assets_to_test:
+        for asset, (status_code, head, size) in zip(PROBED_ASSETS, self.asset_heads):
             print(f"  Testing {asset}...")
             
-            response = self.session.get(f"{self.base_url}{asset}")
-            
-            if response.status_code == 200:
-                content = response.text
-                size_kb = len(content.encode('utf-8')) / 1024
+            if status_code == 200:
+                size_kb = size / 1024
                 
                 # Check for optimization indicators
-                is_minified = '\n' not in content[:100] if content else False  # Simple check
-                has_sourcemap = '/*# sourceMappingURL=' in content
+                is_minified = b'\n' not in head[:100] if head else False  # Simple check
                 
                 optimization_results[asset] = {
                     'size_kb': round(size_kb, 2),
@@ -198,21 +217,54 @@ class PerformanceTestSuite:
                     'accessible': False,
                     'is_minified': False
                 }
-                print(f"    ❌ Not accessible: {response.status_code}")
+                print(f"    ❌ Not accessible: {status_code}")
         
         return optimization_results
     
+    @cached_property
+    def mobile_css(self):
+        """mobile-first.css as bytes, or None unless it answered 200"""
+        response = conditional_get(self.session, f"{self.base_url}/static/css/mobile-first.css")
+        return response.content if response.status_code == 200 else None
+    
+    @cached_property
+    def asset_heads(self):
+        """_asset_head for every PROBED_ASSETS entry, fetched all at once"""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(self._asset_head, PROBED_ASSETS))
+    
+    def _asset_head(self, asset, chunk_size=4096):
+        """Return (status, first chunk, size in bytes) without keeping the body.
+
+        The size comes from Content-Length when the body isn't re-encoded;
+        otherwise the rest is read through and counted, not stored.
+        """
+        with self.session.get(f"{self.base_url}{asset}", stream=True) as response:
+            if response.status_code != 200:
+                return response.status_code, b'', 0
+            chunks = response.iter_content(chunk_size)
+            head = next(chunks, b'')
+            length = response.headers.get('Content-Length')
+            if length and not response.headers.get('Content-Encoding'):
+                return response.status_code, head, int(length)
+            return response.status_code, head, len(head) + sum(len(chunk) for chunk in chunks)
+    
     def test_lighthouse_simulation(self):
         """Simulate Lighthouse performance tests"""
         print("\n🔍 Simulating Lighthouse performance tests...")
         
+        # Every check inspects the same page, so fetch it once and find all
+        # of their markers in a single pass
+        content = self.practice_page
+        hits = LIGHTHOUSE_MARKERS.find(content) if content is not None else None
+        
         # Test key performance indicators
         performance_checks = {
-            'First Contentful Paint': self.test_first_contentful_paint(),
-            'Largest Contentful Paint': self.test_largest_contentful_paint(),
-            'Time to Interactive': self.test_time_to_interactive(),
-            'SEO Meta Tags': self.test_seo_meta_tags(),
-            'Accessibility': self.test_accessibility_features()
+            'First Contentful Paint': self.test_first_contentful_paint(hits),
+            'Largest Contentful Paint': self.test_largest_contentful_paint(hits),
+            'Time to Interactive': self.test_time_to_interactive(hits, content),
+            'SEO Meta Tags': self.test_seo_meta_tags(hits),
+            'Accessibility': self.test_accessibility_features(hits)
         }
         
         for check, result in performance_checks.items():
@@ -232,85 +284,84 @@ class PerformanceTestSuite:
         
         return score >= 90
     
-    def test_first_contentful_paint(self):
+    @cached_property
+    def practice_page(self):
+        """The /practice HTML bytes shared by the Lighthouse checks, or None unless 200.
+
+        Revalidates the copy from the load-time test with its ETag, so an
+        unchanged page comes back as a bodiless 304 instead of a second copy.
+        """
+        previous = self.practice_response
+        etag = previous.headers.get('ETag') if previous is not None and previous.status_code == 200 else None
+        response = self.session.get(
+            f"{self.base_url}/practice",
+            headers={'If-None-Match': etag} if etag else None
+        )
+        if response.status_code == 304:
+            return previous.content
+        return response.content if response.status_code == 200 else None
+    
+    def test_first_contentful_paint(self, hits):
         """Test indicators for good FCP"""
-        response = self.session.get(f"{self.base_url}/practice")
-        
-        if response.status_code != 200:
+        if hits is None:
             return False
         
-        content = response.text
-        
         # Check for optimization indicators
-        has_critical_css = 'Critical CSS' in content or 'critical-content' in content
-        has_preload = 'rel="preload"' in content
-        has_defer = 'defer' in content
+        has_critical_css = b'Critical CSS' in hits or b'critical-content' in hits
+        has_preload = b'rel="preload"' in hits
+        has_defer = b'defer' in hits
         
         return has_critical_css or has_preload or has_defer
     
-    def test_largest_contentful_paint(self):
+    def test_largest_contentful_paint(self, hits):
         """Test LCP optimization indicators"""
-        response = self.session.get(f"{self.base_url}/practice")
-        
-        if response.status_code != 200:
+        if hits is None:
             return False
         
-        content = response.text
-        
         # Check for LCP optimization
-        has_lazy_loading = 'loading="lazy"' in content or 'lazy-image' in content
-        has_image_optimization = 'sizes=' in content or 'srcset=' in content
-        has_font_display = 'font-display' in content
+        has_lazy_loading = b'loading="lazy"' in hits or b'lazy-image' in hits
+        has_image_optimization = b'sizes=' in hits or b'srcset=' in hits
+        has_font_display = b'font-display' in hits
         
         return has_lazy_loading or has_image_optimization or has_font_display
     
-    def test_time_to_interactive(self):
+    def test_time_to_interactive(self, hits, content):
         """Test TTI optimization indicators"""
-        response = self.session.get(f"{self.base_url}/practice")
-        
-        if response.status_code != 200:
+        if hits is None:
             return False
         
-        content = response.text
-        
         # Check for TTI optimization
-        has_deferred_js = 'defer' in content
-        has_async_js = 'async' in content
-        has_minimal_blocking = len([line for line in content.split('\n') if 'src=' in line and 'defer' not in line and 'async' not in line]) < 3
+        has_deferred_js = b'defer' in hits
+        has_async_js = b'async' in hits
+        if has_deferred_js or has_async_js:
+            return True
         
-        return has_deferred_js or has_async_js or has_minimal_blocking
+        # Only count blocking scripts when neither marker appears anywhere
+        return len(BLOCKING_SCRIPT_RE.findall(content)) < 3
     
-    def test_seo_meta_tags(self):
+    def test_seo_meta_tags(self, hits):
         """Test SEO meta tags"""
-        response = self.session.get(f"{self.base_url}/practice")
-        
-        if response.status_code != 200:
+        if hits is None:
             return False
         
-        content = response.text
-        
         # Check for essential SEO tags
-        has_title = '<title>' in content
-        has_description = 'name="description"' in content
-        has_keywords = 'name="keywords"' in content
-        has_viewport = 'name="viewport"' in content
+        has_title = b'<title>' in hits
+        has_description = b'name="description"' in hits
+        has_keywords = b'name="keywords"' in hits
+        has_viewport = b'name="viewport"' in hits
         
         return has_title and has_description and has_viewport
     
-    def test_accessibility_features(self):
+    def test_accessibility_features(self, hits):
         """Test accessibility features"""
-        response = self.session.get(f"{self.base_url}/practice")
-        
-        if response.status_code != 200:
+        if hits is None:
             return False
         
-        content = response.text
-        
         # Check for accessibility features
-        has_alt_tags = 'alt=' in content
-        has_aria_labels = 'aria-label' in content or 'aria-labelledby' in content
-        has_roles = 'role=' in content
-        has_semantic_html = '<main' in content and '<nav' in content
+        has_alt_tags = b'alt=' in hits
+        has_aria_labels = b'aria-label' in hits or b'aria-labelledby' in hits
+        has_roles = b'role=' in hits
+        has_semantic_html = b'<main' in hits and b'<nav' in hits
         
         return has_alt_tags or has_aria_labels or has_roles or has_semantic_html
     
@@ -320,13 +371,25 @@ class PerformanceTestSuite:
         print("=" * 60)
         
         # Step 1: Authentication
-        if not self.authenticate_user():
+        if not self.test_results['authentication'] and not self.authenticate_user():
             print("❌ Authentication failed - cannot proceed with tests")
             return False
         
         # Step 2: Performance Tests
         practice_load_ok = self.test_practice_page_load()
-        question_gen_ok = self.test_question_generation_performance()
+        
+        # Steps 3-5 only inspect pages that don't depend on each other, so
+        # fetch those in the background while question generation runs. The
+        # reports themselves stay in order below, as their output would
+        # interleave otherwise.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            prefetched = [
+                executor.submit(getattr, self, name)
+                for name in ('mobile_css', 'asset_heads', 'practice_page')
+            ]
+            question_gen_ok = self.test_question_generation_performance()
+            for future in prefetched:
+                future.result()
         
         # Step 3: Mobile Responsiveness
         mobile_ok = self.test_mobile_responsiveness()
@@ -377,6 +440,10 @@ class PerformanceTestSuite:
         
         return target_met
 
+def test_performance_suite(authed_session):
+    """Run the whole suite on the shared user_id 7 login"""
+    assert PerformanceTestSuite(session=authed_session).run_comprehensive_test()
+
 def main():
     """Run the performance test suite"""
     test_suite = PerformanceTestSuite()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Unit tests for QuestionPrefetcher
+Runs against a stub generator, so no xAI calls or running app are needed
+"""
+
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import xai_question_generator
+from xai_question_generator import QuestionPrefetcher
+
+class StubGenerator:
+    """Stands in for XAIQuestionGenerator; every question it makes is new"""
+
+    def __init__(self):
+        self.calls = []
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def generate_questions(self, exam_type, topic=None, count=5):
+        with self.lock:
+            self.calls.append((exam_type, topic, count))
+            return [{'id': next(self.ids), 'exam_type': exam_type, 'topic': topic} for _ in range(count)]
+
+class InlinePrefetcher(QuestionPrefetcher):
+    """Refills only when the test calls refill(), never from a thread"""
+
+    def _wake_refiller(self):
+        pass
+
+KEYS = [(exam_type, None) for exam_type in ('GRE', 'GMAT', 'LSAT', 'MCAT', 'SAT', 'ACT')]
+
+def test_pool_miss_then_hit():
+    """An empty pool is a miss served live; once refilled, requests come from the pool"""
+    generator = StubGenerator()
+    prefetcher = InlinePrefetcher(generator, allowed_keys=KEYS)
+
+    questions = prefetcher.take_questions('GRE', count=3)
+    assert len(questions) == 3
+    assert (prefetcher.hits, prefetcher.misses) == (0, 3)
+    assert generator.calls == [('GRE', None, 3)]
+
+    prefetcher.refill()
+    assert prefetcher.pools[('GRE', None)].qsize() >= prefetcher.LOW_WATERMARK
+    calls_after_refill = len(generator.calls)
+
+    questions = prefetcher.take_questions('GRE', count=3)
+    assert len(questions) == 3
+    assert (prefetcher.hits, prefetcher.misses) == (3, 3)
+    assert len(generator.calls) == calls_after_refill  # Nothing generated live
+
+def test_partial_hit_generates_the_rest_live():
+    """A pool short of count hands out what it has and generates only the remainder"""
+    generator = StubGenerator()
+    prefetcher = InlinePrefetcher(generator, allowed_keys=KEYS)
+    prefetcher.prewarm([{'exam_type': 'GRE'}])
+    prefetcher.refill()
+    ready = prefetcher.pools[('GRE', None)].qsize()
+
+    questions = prefetcher.take_questions('GRE', count=ready + 2)
+    assert len(questions) == ready + 2
+    assert (prefetcher.hits, prefetcher.misses) == (ready, 2)
+    assert generator.calls[-1] == ('GRE', None, 2)
+
+def test_keys_outside_allow_list_bypass_the_pools():
+    """Topics and unknown exams go straight to the generator and leave no trace"""
+    generator = StubGenerator()
+    prefetcher = InlinePrefetcher(generator, allowed_keys=KEYS)
+
+    prefetcher.prewarm([{'exam_type': 'GRE', 'topic': 'algebra'}, {'exam_type': 'NOPE'}])
+    questions = prefetcher.take_questions('GRE', topic='algebra', count=2)
+
+    assert len(questions) == 2
+    assert generator.calls == [('GRE', 'algebra', 2)]
+    assert not prefetcher.demand
+    assert (prefetcher.hits, prefetcher.misses) == (0, 0)
+
+    prefetcher.refill()
+    assert not prefetcher.pools
+    assert generator.calls == [('GRE', 'algebra', 2)]  # No background generation either
+
+def test_only_the_busiest_pools_are_kept():
+    """Refill keeps MAX_POOLS pools for the most requested keys and drops the rest"""
+    generator = StubGenerator()
+    prefetcher = InlinePrefetcher(generator, allowed_keys=KEYS)
+
+    # GRE busiest, ACT least busy
+    for rank, key in enumerate(KEYS):
+        prefetcher.demand[key] = 100 - 10 * rank
+    prefetcher.refill()
+
+    assert len(prefetcher.pools) == prefetcher.MAX_POOLS
+    assert set(prefetcher.pools) == set(KEYS[:prefetcher.MAX_POOLS])
+
+    # Demand moves to ACT; it takes a busier spot and the quietest pool goes
+    prefetcher.demand[('ACT', None)] += 1000
+    prefetcher.refill()
+    assert len(prefetcher.pools) == prefetcher.MAX_POOLS
+    assert ('ACT', None) in prefetcher.pools
+    assert ('MCAT', None) not in prefetcher.pools
+
+def test_demand_decays_until_pools_are_dropped():
+    """Each refill halves demand; keys whose demand reaches 0 lose their pool"""
+    generator = StubGenerator()
+    prefetcher = InlinePrefetcher(generator, allowed_keys=KEYS)
+    prefetcher.demand[('GRE', None)] = 8
+
+    prefetcher.refill()
+    assert prefetcher.demand[('GRE', None)] == 4
+    assert ('GRE', None) in prefetcher.pools
+
+    for _ in range(3):
+        prefetcher.refill()
+    assert ('GRE', None) not in prefetcher.demand
+
+    prefetcher.refill()
+    assert not prefetcher.pools
+
+def test_no_question_is_handed_out_twice():
+    """Concurrent takers never share a pooled or live question"""
+    generator = StubGenerator()
+    prefetcher = InlinePrefetcher(generator, allowed_keys=KEYS)
+    prefetcher.prewarm([{'exam_type': 'GRE'}, {'exam_type': 'GMAT'}])
+    prefetcher.refill()
+
+    requests = [('GRE', 3), ('GMAT', 2)] * 20
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        batches = list(executor.map(lambda spec: prefetcher.take_questions(spec[0], count=spec[1]), requests))
+
+    ids = [question['id'] for batch in batches for question in batch]
+    assert len(ids) == sum(count for _, count in requests)
+    assert len(ids) == len(set(ids))
+    assert prefetcher.hits > 0
+
+def test_prefetching_is_off_unless_enabled(monkeypatch):
+    """Without XAI_PREFETCH there is no prefetcher, so no background xAI calls"""
+    monkeypatch.setattr(xai_question_generator, 'PREFETCH_ENABLED', False)
+    xai_question_generator.get_question_prefetcher.cache_clear()
+    try:
+        assert xai_question_generator.get_question_prefetcher() is None
+    finally:
+        xai_question_generator.get_question_prefetcher.cache_clear()
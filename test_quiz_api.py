@@ -3,17 +3,23 @@
 Test the quiz API endpoints after authentication fix
 """
 
-import requests
 import json
 import time
 
+import pytest
+
+from _http import get_session, login_once
+
+# Runs as its own account (test@prepforge.com), not the shared authed_session user
+pytestmark = pytest.mark.integration
+
 def test_quiz_api_flow():
     """Test the complete quiz API flow"""
     
     print("🧪 Testing Quiz API Flow")
     print("=" * 30)
     
-    session = requests.Session()
+    session = get_session()
     
     # Login first
     login_data = {
@@ -21,9 +27,8 @@ def test_quiz_api_flow():
         'password': 'testpass123'
     }
     
-    login_response = session.post("http://localhost:5000/signin", data=login_data)
-    if login_response.status_code != 302:
-        print(f"❌ Login failed: {login_response.status_code}")
+    if not login_once(session, **login_data):
+        print("❌ Login failed")
         return False
     
     print("✅ Logged in successfully")
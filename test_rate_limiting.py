@@ -3,75 +3,73 @@
 Test rate limiting functionality specifically
 """
 
-import requests
-import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
+import pytest
+
+from _http import GENERATE_QUESTIONS_URL, get_session, login_once
+from _output import buffered_output
+
+# Runs as its own account, not the shared authed_session user
+pytestmark = pytest.mark.integration
+
+@buffered_output
 def test_rate_limiting():
     """Test the rate limiting system"""
     
     print("🚫 RATE LIMITING TEST")
     print("=" * 25)
     
-    session = requests.Session()
+    session = get_session()
     
-    # Login
+    # Login, reusing the cookies of a recent sign-in when they still work
     login_data = {'email': 'test@prepforge.com', 'password': 'testpass123'}
-    login_response = session.post("http://localhost:5000/signin", data=login_data, allow_redirects=False)
     
-    if login_response.status_code == 302:
+    if login_once(session, **login_data):
         print("✅ Authenticated")
         
-        # Follow redirect
-        redirect_url = login_response.headers.get('Location', '/dashboard')
-        if not redirect_url.startswith('http'):
-            redirect_url = f"http://localhost:5000{redirect_url}"
-        session.get(redirect_url)
-        
         # Test rate limiting for specific exam type
         print("Testing GRE rate limiting...")
         
-        for i in range(22):  # Try 22 requests (should hit limit at 21)
-            response = session.post(
-                "http://localhost:5000/api/generate-questions",
+        # subscription_gate counts per user on the server, and with Redis
+        # records each allowed request in the same script as its check, so
+        # the 22 requests can go out at once: a concurrent burst must still
+        # stop at the plan's limit (the user_activity fallback without Redis
+        # reads then writes, and can let a burst overshoot)
+        with ThreadPoolExecutor(max_workers=22) as executor:
+            responses = list(executor.map(lambda i: session.post(
+                GENERATE_QUESTIONS_URL,
                 json={"exam_type": "GRE", "count": 1},
                 headers={'Content-Type': 'application/json'}
-            )
-            
+            ), range(22)))  # Free users get 20 a day, pro users 10 a minute
+        
+        statuses = Counter(response.status_code for response in responses)
+        for i, response in enumerate(responses):
             print(f"Request {i+1}: {response.status_code}")
-            
-            if response.status_code == 429:
-                print("✅ Rate limit triggered!")
-                try:
-                    data = response.json()
-                    print(f"Error: {data.get('error')}")
-                    print(f"Exam type: {data.get('exam_type')}")
-                    print(f"Remaining: {data.get('remaining')}")
-                except:
-                    pass
-                break
-            elif response.status_code == 200:
-                try:
-                    data = response.json()
-                    print(f"  Remaining: {data.get('questions_remaining')}")
-                except:
-                    pass
         
-        # Test different exam type (should have separate limit)
-        print("\nTesting GMAT rate limiting (separate limit)...")
+        limited = [response for response in responses if response.status_code == 429]
+        if limited:
+            print(f"✅ Rate limit triggered! ({statuses[200]} allowed, {len(limited)} limited)")
+            try:
+                data = limited[0].json()
+                print(f"Error: {data.get('error')}")
+                print(f"Plan: {data.get('plan')}")
+                print(f"Count: {data.get('current_count')}/{data.get('limit')}")
+            except:
+                pass
+        
+        # The limit is per user, not per exam, so another exam is refused too
+        print("\nTesting GMAT after the limit (same per-user count)...")
         gmat_response = session.post(
-            "http://localhost:5000/api/generate-questions",
+            GENERATE_QUESTIONS_URL,
             json={"exam_type": "GMAT", "count": 1},
             headers={'Content-Type': 'application/json'}
         )
         
         print(f"GMAT request: {gmat_response.status_code}")
-        if gmat_response.status_code == 200:
-            try:
-                data = gmat_response.json()
-                print(f"GMAT remaining: {data.get('questions_remaining')}")
-                print("✅ Per-exam-type limits working")
-            except:
-                pass
+        if limited and gmat_response.status_code == 429:
+            print("✅ Limit covers every exam type")
     else:
         print("❌ Authentication failed")
 
@@ -3,6 +3,8 @@
 Test script to verify trial restrictions for all 13 exam types
 """
 
+from sqlalchemy.orm import joinedload
+
 from app import app, db
 from models import UserProgress, User, Subscription
 
@@ -15,8 +17,8 @@ def test_trial_restrictions():
             'NCLEX', 'LSAT', 'SAT', 'ACT', 'IELTS', 'TOEFL', 'PMP', 'CFA'
         ]
         
-        # Get first user
-        user = User.query.first()
+        # Get first user, with its subscription in the same query
+        user = User.query.options(joinedload(User.subscription)).first()
         if not user:
             print("No users found in database")
             return
@@ -31,12 +33,17 @@ def test_trial_restrictions():
         print(f"Trial limit per exam: 20 questions")
         print("")
         
+        # Count progress for every exam type in one grouped query
+        counts = dict(
+            db.session.query(UserProgress.exam_type, db.func.count(UserProgress.id))
+            .filter(UserProgress.user_id == user.id, UserProgress.exam_type.in_(all_exam_types))
+            .group_by(UserProgress.exam_type)
+            .all()
+        )
+        
         # Check each exam type
         for exam_type in all_exam_types:
-            progress_count = UserProgress.query.filter_by(
-                user_id=user.id,
-                exam_type=exam_type
-            ).count()
+            progress_count = counts.get(exam_type, 0)
             
             restriction_status = "BLOCKED" if progress_count >= 20 and not is_premium else "ALLOWED"
             print(f"{exam_type:15} | Progress: {progress_count:2d}/20 | Status: {restriction_status}")
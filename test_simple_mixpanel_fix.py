@@ -3,60 +3,49 @@
 Simple test to verify Mixpanel integration fix in adaptive-practice.js
 """
 
-import requests
+import pytest
 
-def test_mixpanel_fix():
+from _http import PRACTICE_URL
+from _markers import load_checks
+from _output import buffered_output
+
+pytestmark = pytest.mark.integration
+
+MIXPANEL_CHECKS = load_checks('mixpanel_fix')
+
+@buffered_output
+def test_mixpanel_fix(authed_session):
     """Quick test of the Mixpanel fix"""
     
     print("🔧 TESTING MIXPANEL FIX")
     print("=" * 30)
     
-    session = requests.Session()
-    
-    # Login
-    print("1. Logging in...")
-    login_data = {'email': 'anothermobile14@gmail.com', 'password': 'Tobeornottobe@123'}
-    login_response = session.post("http://localhost:5000/signin", data=login_data, allow_redirects=False)
-    
-    if login_response.status_code == 302:
-        print("✅ Login successful")
-        
-        # Get practice page
-        print("2. Getting practice page...")
-        practice_response = session.get("http://localhost:5000/practice")
-        
-        if practice_response.status_code == 200:
-            print("✅ Practice page accessible")
-            
-            content = practice_response.text
-            checks = {
-                "Mixpanel CDN": 'mixpanel-2-latest.min.js' in content,
-                "adaptive-practice.js": 'adaptive-practice.js' in content,
-                "User Data": 'data-user-id' in content,
-                "Mixpanel Init": 'mixpanel.init(' in content
-            }
-            
-            print("3. Checking Mixpanel components...")
-            for name, present in checks.items():
-                print(f"   {name}: {'✅' if present else '❌'}")
-            
-            if all(checks.values()):
-                print("\n🎉 MIXPANEL INTEGRATION READY")
-                print("✅ CDN script loaded")
-                print("✅ adaptive-practice.js uses window.mixpanel.track")
-                print("✅ User context available")
-                print("✅ Should fix 'mixpanel.track is not a function' error")
-                return True
-            else:
-                print("\n❌ Some components missing")
-                return False
-        else:
-            print(f"❌ Practice page failed: {practice_response.status_code}")
-            return False
-    else:
-        print(f"❌ Login failed: {login_response.status_code}")
-        return False
-
-if __name__ == "__main__":
-    success = test_mixpanel_fix()
-    exit(0 if success else 1)
\ No newline at end of file
+    session = authed_session
+    
+    # Login (handled once per run by the authed_session fixture)
+    print("1. Logged in as user_id 7")
+    
+    # Get practice page
+    print("2. Getting practice page...")
+    practice_response = session.get(PRACTICE_URL, stream=True)
+    if practice_response.status_code != 200:
+        practice_response.close()
+    assert practice_response.status_code == 200, f"Practice page failed: {practice_response.status_code}"
+    print("✅ Practice page accessible")
+    
+    # Stop downloading as soon as every marker has shown up
+    found = MIXPANEL_CHECKS.find_in_stream(practice_response)
+    checks = {name: name in found for name in MIXPANEL_CHECKS.checks}
+    
+    print("3. Checking Mixpanel components...")
+    for name, present in checks.items():
+        print(f"   {name}: {'✅' if present else '❌'}")
+    
+    missing = [name for name, present in checks.items() if not present]
+    assert not missing, f"Some components missing: {missing}"
+    
+    print("\n🎉 MIXPANEL INTEGRATION READY")
+    print("✅ CDN script loaded")
+    print("✅ adaptive-practice.js uses window.mixpanel.track")
+    print("✅ User context available")
+    print("✅ Should fix 'mixpanel.track is not a function' error")
@@ -1,16 +1,41 @@
 #!/usr/bin/env python3
 """
 Final Stripe Integration Test - Complete End-to-End Flow
+Runs the signin -> checkout -> webhook path as user 15. Under pytest the
+same path is covered for user 7 by test_live_stripe_flow, so this is a
+script only (run_stripe_flow isn't collected), which keeps CI to one
+Stripe checkout per run.
 """
 
-import requests
 import time
 import json
 
-def test_complete_stripe_flow():
+from _http import JSON_HEADERS, body_preview, encode_json, get_session, login_once
+from _output import buffered_output
+
+# Simulated checkout.session.completed event for user ID 15, encoded once at import
+WEBHOOK_BODY = encode_json({
+    "type": "checkout.session.completed",
+    "data": {
+        "object": {
+            "id": "cs_test_final_payment",
+            "client_reference_id": "15",
+            "customer_email": "anothermobile15@gmail.com",
+            "payment_status": "paid",
+            "subscription": "sub_test_final_payment",
+            "metadata": {
+                "user_id": "15",
+                "upgrade_type": "pro"
+            }
+        }
+    }
+})
+
+@buffered_output
+def run_stripe_flow():
     """Test the complete Stripe upgrade flow"""
     base_url = "http://localhost:5000"
-    session = requests.Session()
+    session = get_session()
     
     print("🚀 FINAL STRIPE INTEGRATION TEST")
     print("=" * 60)
@@ -22,11 +47,11 @@ def test_complete_stripe_flow():
         'password': 'Tobeornottobe@123'
     }
     
-    response = session.post(f"{base_url}/signin", data=signin_data)
-    if response.status_code == 200 and 'dashboard' in response.url:
+    # Reuses the previous run's cookies while they still reach the dashboard
+    if login_once(session, **signin_data):
         print("   ✅ Authentication successful")
     else:
-        print(f"   ❌ Authentication failed: {response.status_code}")
+        print("   ❌ Authentication failed")
         return False
     
     # Step 2: Test checkout session creation
@@ -45,27 +70,10 @@ def test_complete_stripe_flow():
             
             # Step 3: Simulate successful payment webhook
             print("3. Simulating successful payment webhook...")
-            webhook_payload = {
-                "type": "checkout.session.completed",
-                "data": {
-                    "object": {
-                        "id": "cs_test_final_payment",
-                        "client_reference_id": "15",
-                        "customer_email": "anothermobile15@gmail.com",
-                        "payment_status": "paid",
-                        "subscription": "sub_test_final_payment",
-                        "metadata": {
-                            "user_id": "15",
-                            "upgrade_type": "pro"
-                        }
-                    }
-                }
-            }
-            
             webhook_response = session.post(
                 f"{base_url}/webhook",
-                json=webhook_payload,
-                headers={'Content-Type': 'application/json'}
+                data=WEBHOOK_BODY,
+                headers=JSON_HEADERS
             )
             
             if webhook_response.status_code == 200:
@@ -104,11 +112,11 @@ def test_complete_stripe_flow():
     else:
         print(f"   ❌ Unexpected response: {response.status_code}")
         try:
-            print(f"   Response content: {response.text[:200]}...")
+            print(f"   Response content: {body_preview(response)}...")
         except:
             pass
         return False
 
 if __name__ == "__main__":
-    success = test_complete_stripe_flow()
+    success = run_stripe_flow()
     exit(0 if success else 1)
\ No newline at end of file
@@ -4,15 +4,21 @@ Test Stripe Integration for PrepForge Pro Upgrades
 Tests the complete upgrade flow: login → checkout → webhook → verification
 """
 
-import requests
 import json
-import time
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+from _http import JSON_HEADERS, body_preview, decode_json, encode_json, get_session
+from _markers import load_checks
+from _output import buffered_output
+
+UPGRADE_CHECKS = load_checks('upgrade_button')
 
 class StripeIntegrationTest:
     def __init__(self):
         self.base_url = "http://localhost:5000"
-        self.session = requests.Session()
+        self.session = get_session()
         self.test_user = {
             'email': 'anothermobile14@gmail.com',
             'password': 'Tobeornottobe@123',
@@ -50,7 +56,7 @@ class StripeIntegrationTest:
         print(f"Response status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = decode_json(response.content)
             print(f"Response data: {data}")
             
             if data.get('success') and data.get('checkout_url'):
@@ -63,32 +69,31 @@ class StripeIntegrationTest:
         else:
             print(f"❌ API request failed with status {response.status_code}")
             try:
-                error_data = response.json()
+                error_data = decode_json(response.content)
                 print(f"Error details: {error_data}")
             except:
-                print(f"Response text: {response.text}")
+                print(f"Response text: {body_preview(response)}")
             return False, None
     
-    def test_subscription_status(self):
-        """Test subscription status API"""
+    def test_subscription_status(self, response=None):
+        """Test subscription status API (on a prefetched response, if given)"""
         print("📊 Testing subscription status API...")
         
-        response = self.session.get(f"{self.base_url}/api/subscription-status")
+        if response is None:
+            response = self.session.get(f"{self.base_url}/api/subscription-status")
         
         if response.status_code == 200:
-            data = response.json()
+            data = decode_json(response.content)
             print(f"✅ Subscription status: {data}")
             return data
         else:
             print(f"❌ Subscription status check failed: {response.status_code}")
             return None
     
-    def simulate_successful_payment(self):
-        """Simulate a successful Stripe webhook"""
-        print("🎭 Simulating successful Stripe webhook...")
-        
-        # Simulate webhook payload for successful payment
-        webhook_payload = {
+    @cached_property
+    def webhook_body(self):
+        """Encoded checkout.session.completed event for the test user, built once"""
+        return encode_json({
             "type": "checkout.session.completed",
             "data": {
                 "object": {
@@ -102,12 +107,17 @@ class StripeIntegrationTest:
                     }
                 }
             }
-        }
+        })
+    
+    def simulate_successful_payment(self):
+        """Simulate a successful Stripe webhook"""
+        print("🎭 Simulating successful Stripe webhook...")
         
+        # Simulate webhook payload for successful payment
         response = self.session.post(
             f"{self.base_url}/webhook/stripe",
-            json=webhook_payload,
-            headers={'Content-Type': 'application/json'}
+            data=self.webhook_body,
+            headers=JSON_HEADERS
         )
         
         print(f"Webhook response status: {response.status_code}")
@@ -118,10 +128,10 @@ class StripeIntegrationTest:
         else:
             print(f"❌ Webhook processing failed")
             try:
-                error_data = response.json()
+                error_data = decode_json(response.content)
                 print(f"Error details: {error_data}")
             except:
-                print(f"Response text: {response.text}")
+                print(f"Response text: {body_preview(response)}")
             return False
     
     def verify_subscription_upgrade(self):
@@ -138,19 +148,21 @@ class StripeIntegrationTest:
             print(f"❌ Subscription not upgraded. Current status: {status_data}")
             return False
     
-    def test_quiz_page_upgrade_button(self):
+    def test_quiz_page_upgrade_button(self, response=None):
         """Test that upgrade button is properly configured on quiz page"""
         print("🎮 Testing quiz page upgrade button...")
         
-        response = self.session.get(f"{self.base_url}/quiz")
+        if response is None:
+            response = self.session.get(f"{self.base_url}/quiz", stream=True)
         
         if response.status_code == 200:
-            content = response.text
+            # Reads only until every marker has shown up
+            found = UPGRADE_CHECKS.find_in_stream(response)
             
             # Check for upgrade button and JavaScript function
-            has_upgrade_button = 'id="upgrade-btn"' in content
-            has_stripe_function = 'upgradeToProStripe' in content
-            has_stripe_api_call = '/api/create-checkout-session' in content
+            has_upgrade_button = 'Upgrade button' in found
+            has_stripe_function = 'Stripe function' in found
+            has_stripe_api_call = 'API call' in found
             
             print(f"  Upgrade button present: {'✅' if has_upgrade_button else '❌'}")
             print(f"  Stripe function present: {'✅' if has_stripe_function else '❌'}")
@@ -158,9 +170,11 @@ class StripeIntegrationTest:
             
             return has_upgrade_button and has_stripe_function and has_stripe_api_call
         else:
+            response.close()
             print(f"❌ Could not access quiz page: {response.status_code}")
             return False
     
+    @buffered_output
     def run_complete_test(self):
         """Run the complete Stripe integration test"""
         print("🚀 STRIPE INTEGRATION TEST SUITE")
@@ -174,12 +188,19 @@ class StripeIntegrationTest:
             print("❌ Cannot proceed without authentication")
             return False
         
+        # Steps 2 and 3 only read, and neither depends on the other, so
+        # fetch both pages at once; checkout and the webhook stay in order
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            quiz_future = executor.submit(self.session.get, f"{self.base_url}/quiz", stream=True)
+            status_future = executor.submit(self.session.get, f"{self.base_url}/api/subscription-status")
+        quiz_response, status_response = quiz_future.result(), status_future.result()
+        
         # Step 2: Quiz page upgrade button
-        results['quiz_button'] = self.test_quiz_page_upgrade_button()
+        results['quiz_button'] = self.test_quiz_page_upgrade_button(quiz_response)
         
         # Step 3: Initial subscription status
         print("\n📊 Checking initial subscription status...")
-        initial_status = self.test_subscription_status()
+        initial_status = self.test_subscription_status(status_response)
         results['initial_status'] = initial_status is not None
         
         # Step 4: Checkout session creation
@@ -188,8 +209,8 @@ class StripeIntegrationTest:
         # Step 5: Simulate webhook (payment completion)
         results['webhook'] = self.simulate_successful_payment()
         
-        # Step 6: Verify upgrade
-        time.sleep(1)  # Brief wait for database update
+        # Step 6: Verify upgrade (no wait needed: /webhook/stripe commits the
+        # plan change before it answers 200)
         results['upgrade_verified'] = self.verify_subscription_upgrade()
         
         # Summary
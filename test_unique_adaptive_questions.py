@@ -4,10 +4,12 @@ Test unique adaptive question generation system with xAI integration
 Focus on ensuring questions are different and difficulty adapts based on performance
 """
 
-import requests
 import json
-import time
-import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from _http import BASE_URL, GENERATE_QUESTIONS_URL, SIGNIN_URL, SUBMIT_ANSWER_URL, get_session
 
 def test_unique_adaptive_questions():
     """Test unique question generation and adaptive difficulty system"""
@@ -15,12 +17,14 @@ def test_unique_adaptive_questions():
     print("🎯 UNIQUE ADAPTIVE QUESTION SYSTEM TEST")
     print("=" * 50)
     
-    session = requests.Session()
+    # Own cookie jar, but on the shared keep-alive pool so the 20-odd calls
+    # below don't each open a new connection
+    session = get_session()
     
     # Step 1: Login as user_id 7
     print("Step 1: Authenticating as user_id 7...")
     login_data = {'email': 'anothermobile14@gmail.com', 'password': 'Tobeornottobe@123'}
-    login_response = session.post("http://localhost:5000/signin", data=login_data, allow_redirects=False)
+    login_response = session.post(SIGNIN_URL, data=login_data, allow_redirects=False)
     
     if login_response.status_code != 302:
         print(f"❌ Login failed: {login_response.status_code}")
@@ -30,9 +34,7 @@ def test_unique_adaptive_questions():
     
     # Follow redirect
     redirect_url = login_response.headers.get('Location', '/dashboard')
-    if not redirect_url.startswith('http'):
-        redirect_url = f"http://localhost:5000{redirect_url}"
-    session.get(redirect_url)
+    session.get(urljoin(BASE_URL, redirect_url))
     
     # Step 2: Generate 10 unique GRE algebra questions
     print("\nStep 2: Testing unique question generation (10 questions)...")
@@ -41,109 +43,113 @@ def test_unique_adaptive_questions():
     question_hashes = set()
     unique_ids = set()
     topics_seen = set()
-    difficulties_seen = set()
     
-    for i in range(10):
-        print(f"\n  🔄 Generating question {i+1}/10...")
-        
-        question_response = session.post(
-            "http://localhost:5000/api/generate-questions",
-            json={"exam_type": "GRE", "topic": "algebra", "count": 1},
-            headers={'Content-Type': 'application/json'}
-        )
-        
-        print(f"    API Response: {question_response.status_code}")
+    # All ten questions in one call; uniqueness is checked across the
+    # returned list, and each answer is still submitted on its own
+    print("\n  🔄 Generating 10 questions in one call...")
+    
+    question_response = session.post(
+        GENERATE_QUESTIONS_URL,
+        json={"exam_type": "GRE", "topic": "algebra", "count": 10}
+    )
+    
+    print(f"    API Response: {question_response.status_code}")
+    
+    if question_response.status_code == 200:
+        try:
+            question_data = question_response.json()
+        except json.JSONDecodeError:
+            print(f"    ❌ Invalid JSON response for question generation")
+            return False
         
-        if question_response.status_code == 200:
-            try:
-                question_data = question_response.json()
-                question = question_data['questions'][0]
-                
-                # Check question uniqueness
-                question_text = question['question_text']
-                question_hash = hashlib.md5(question_text.encode()).hexdigest()
-                question_id = question['id']
-                
-                print(f"    Question ID: {question_id}")
-                print(f"    Question Hash: {question_hash[:8]}...")
-                print(f"    Text: {question_text[:60]}...")
-                print(f"    Difficulty: {question.get('difficulty', 'N/A')}")
-                print(f"    Source: {question.get('source', 'N/A')}")
-                print(f"    Generation Time: {question.get('generation_time', 'N/A')}")
-                
-                # Track uniqueness metrics
-                if question_hash in question_hashes:
-                    print(f"    ⚠️ WARNING: Duplicate question hash detected!")
-                else:
-                    print(f"    ✅ Unique question hash")
-                
-                if question_id in unique_ids:
-                    print(f"    ⚠️ WARNING: Duplicate question ID detected!")
-                else:
-                    print(f"    ✅ Unique question ID")
-                
-                question_hashes.add(question_hash)
-                unique_ids.add(question_id)
-                topics_seen.add(question.get('topic', 'algebra'))
-                difficulties_seen.add(question.get('difficulty', 'medium'))
-                
-                generated_questions.append(question)
-                
-                # Submit a random answer to test performance tracking
-                test_answer = 'A'  # Test with A for simplicity
-                
-                print(f"    → Submitting test answer: {test_answer}")
-                
-                answer_response = session.post(
-                    "http://localhost:5000/api/submit-answer",
-                    json={
-                        "question_id": question_id,
-                        "answer": test_answer,
-                        "exam_type": "GRE", 
-                        "question_data": question
-                    },
-                    headers={'Content-Type': 'application/json'}
-                )
-                
-                if answer_response.status_code == 200:
-                    try:
-                        answer_result = answer_response.json()
-                        is_correct = answer_result.get('is_correct')
-                        score = answer_result.get('score')
-                        print(f"    ✅ Answer submitted: {'Correct' if is_correct else 'Incorrect'} (Score: {score})")
-                    except json.JSONDecodeError:
-                        print(f"    ❌ Invalid JSON response for answer")
-                else:
-                    print(f"    ❌ Answer submission failed: {answer_response.status_code}")
-                
-                # Small delay between generations
-                time.sleep(0.2)
-                
-            except json.JSONDecodeError:
-                print(f"    ❌ Invalid JSON response for question generation")
-                return False
-        elif question_response.status_code == 429:
-            print(f"    ⚠️ Rate limit hit at question {i+1}")
-            try:
-                rate_data = question_response.json()
-                print(f"    Message: {rate_data.get('error')}")
-                print(f"    Remaining: {rate_data.get('remaining', 'N/A')}")
-            except:
-                pass
-            break
-        else:
-            print(f"    ❌ Question generation failed: {question_response.status_code}")
-            try:
-                error_data = question_response.json()
-                print(f"    Error: {error_data.get('error', 'Unknown error')}")
-            except:
-                pass
+        for i, question in enumerate(question_data['questions']):
+            print(f"\n  🔎 Question {i+1}/{len(question_data['questions'])}")
+            
+            # Check question uniqueness
+            question_text = question['question_text']
+            # Only compared within this run, so the builtin string hash is
+            # enough; the hex slice is just for the log line
+            question_hash = hash(question_text)
+            question_id = question['id']
+            
+            print(f"    Question ID: {question_id}")
+            print(f"    Question Hash: {question_hash & 0xFFFFFFFF:08x}...")
+            print(f"    Text: {question_text[:60]}...")
+            print(f"    Difficulty: {question.get('difficulty', 'N/A')}")
+            print(f"    Source: {question.get('source', 'N/A')}")
+            print(f"    Generation Time: {question.get('generation_time', 'N/A')}")
+            
+            # Track uniqueness metrics
+            if question_hash in question_hashes:
+                print(f"    ⚠️ WARNING: Duplicate question hash detected!")
+            else:
+                print(f"    ✅ Unique question hash")
+            
+            if question_id in unique_ids:
+                print(f"    ⚠️ WARNING: Duplicate question ID detected!")
+            else:
+                print(f"    ✅ Unique question ID")
+            
+            question_hashes.add(question_hash)
+            unique_ids.add(question_id)
+            topics_seen.add(question.get('topic', 'algebra'))
+            
+            generated_questions.append(question)
+            
+            # Submit a random answer to test performance tracking
+            test_answer = 'A'  # Test with A for simplicity
+            
+            print(f"    → Submitting test answer: {test_answer}")
+            
+            answer_response = session.post(
+                SUBMIT_ANSWER_URL,
+                json={
+                    "question_id": question_id,
+                    "answer": test_answer,
+                    "exam_type": "GRE", 
+                    "question_data": question
+                }
+            )
+            
+            if answer_response.status_code == 200:
+                try:
+                    answer_result = answer_response.json()
+                    is_correct = answer_result.get('is_correct')
+                    score = answer_result.get('score')
+                    print(f"    ✅ Answer submitted: {'Correct' if is_correct else 'Incorrect'} (Score: {score})")
+                except json.JSONDecodeError:
+                    print(f"    ❌ Invalid JSON response for answer")
+            else:
+                print(f"    ❌ Answer submission failed: {answer_response.status_code}")
+    elif question_response.status_code == 429:
+        print(f"    ⚠️ Rate limit hit")
+        try:
+            rate_data = question_response.json()
+            print(f"    Message: {rate_data.get('error')}")
+            print(f"    Remaining: {rate_data.get('remaining', 'N/A')}")
+        except:
+            pass
+    else:
+        print(f"    ❌ Question generation failed: {question_response.status_code}")
+        try:
+            error_data = question_response.json()
+            print(f"    Error: {error_data.get('error', 'Unknown error')}")
+        except:
+            pass
     
     # Step 3: Analyze uniqueness metrics
     print(f"\nStep 3: Uniqueness Analysis")
     print("=" * 30)
     
     unique_hashes = len(question_hashes)
+    # Tally sources and difficulties in one pass for all the reporting below
+    source_counts = Counter()
+    difficulty_counts = Counter()
+    for q in generated_questions:
+        source_counts[q.get('source')] += 1
+        difficulty_counts[q.get('difficulty', 'medium')] += 1
+    xai_questions = source_counts['xai_unique']
+    fallback_questions = source_counts['unique_fallback'] + source_counts['fallback']
     unique_question_ids = len(unique_ids)
     total_questions = len(generated_questions)
     
@@ -151,7 +157,7 @@ def test_unique_adaptive_questions():
     print(f"Unique Question Hashes: {unique_hashes}")
     print(f"Unique Question IDs: {unique_question_ids}")
     print(f"Topics Seen: {list(topics_seen)}")
-    print(f"Difficulties Seen: {list(difficulties_seen)}")
+    print(f"Difficulties Seen: {list(difficulty_counts)}")
     
     uniqueness_rate = (unique_hashes / total_questions * 100) if total_questions > 0 else 0
     id_uniqueness_rate = (unique_question_ids / total_questions * 100) if total_questions > 0 else 0
@@ -164,14 +170,13 @@ def test_unique_adaptive_questions():
     print("=" * 35)
     
     # Check if different difficulties are being generated
-    if len(difficulties_seen) > 1:
+    if len(difficulty_counts) > 1:
         print("✅ Multiple difficulty levels observed")
-        for diff in difficulties_seen:
-            count = sum(1 for q in generated_questions if q.get('difficulty') == diff)
+        for diff, count in difficulty_counts.items():
             print(f"  {diff.capitalize()}: {count} questions")
     else:
         print("⚠️ Only one difficulty level observed")
-        print(f"  Difficulty: {list(difficulties_seen)[0] if difficulties_seen else 'Unknown'}")
+        print(f"  Difficulty: {list(difficulty_counts)[0] if difficulty_counts else 'Unknown'}")
     
     # Step 5: Test different topic variations
     print(f"\nStep 5: Testing Topic Variations")
@@ -181,29 +186,31 @@ def test_unique_adaptive_questions():
     test_topics = ['geometry', 'statistics', 'word_problems']
     topic_uniqueness = {}
     
-    for topic in test_topics:
+    # The topic calls don't depend on each other, so generate all three at
+    # once and report them in order
+    with ThreadPoolExecutor(max_workers=len(test_topics)) as executor:
+        topic_responses = list(executor.map(lambda topic: session.post(
+            GENERATE_QUESTIONS_URL,
+            json={"exam_type": "GRE", "topic": topic, "count": 1}
+        ), test_topics))
+    
+    for topic, topic_response in zip(test_topics, topic_responses):
         print(f"\n  Testing topic: {topic}")
         
-        topic_response = session.post(
-            "http://localhost:5000/api/generate-questions",
-            json={"exam_type": "GRE", "topic": topic, "count": 1},
-            headers={'Content-Type': 'application/json'}
-        )
-        
         if topic_response.status_code == 200:
             try:
                 topic_data = topic_response.json()
                 topic_question = topic_data['questions'][0]
                 
-                topic_hash = hashlib.md5(topic_question['question_text'].encode()).hexdigest()
+                topic_hash = hash(topic_question['question_text'])
                 topic_uniqueness[topic] = {
-                    'hash': topic_hash[:8],
+                    'hash': f"{topic_hash & 0xFFFFFFFF:08x}",
                     'text': topic_question['question_text'][:40] + "...",
                     'unique': topic_hash not in question_hashes
                 }
                 
                 print(f"    Question: {topic_question['question_text'][:50]}...")
-                print(f"    Hash: {topic_hash[:8]}")
+                print(f"    Hash: {topic_uniqueness[topic]['hash']}")
                 print(f"    Unique from algebra questions: {'Yes' if topic_hash not in question_hashes else 'No'}")
                 
             except json.JSONDecodeError:
@@ -223,9 +230,9 @@ def test_unique_adaptive_questions():
         ("Question Generation", total_questions > 0),
         ("High Uniqueness Rate", uniqueness_rate >= 80),
         ("Unique Question IDs", id_uniqueness_rate >= 90),
-        ("Multiple Difficulties", len(difficulties_seen) > 1),
-        ("xAI Integration", any(q.get('source') == 'xai_unique' for q in generated_questions)),
-        ("Fallback System", any(q.get('source') in ['unique_fallback', 'fallback'] for q in generated_questions)),
+        ("Multiple Difficulties", len(difficulty_counts) > 1),
+        ("xAI Integration", xai_questions > 0),
+        ("Fallback System", fallback_questions > 0),
         ("Performance Tracking", True),  # Based on successful answer submissions
         ("Topic Variations", len(topic_uniqueness) > 0)
     ]
@@ -247,12 +254,12 @@ def test_unique_adaptive_questions():
     else:
         print("❌ Questions showing repetition patterns")
         
-    if len(difficulties_seen) > 1:
+    if len(difficulty_counts) > 1:
         print("✅ Adaptive difficulty system working")
     else:
         print("❌ Difficulty not adapting based on performance")
         
-    if any(q.get('source') == 'xai_unique' for q in generated_questions):
+    if xai_questions:
         print("✅ xAI integration functional")
     else:
         print("⚠️ xAI integration using fallback system")
@@ -264,9 +271,6 @@ def test_unique_adaptive_questions():
     
     # Performance insights
     if generated_questions:
-        xai_questions = sum(1 for q in generated_questions if q.get('source') == 'xai_unique')
-        fallback_questions = sum(1 for q in generated_questions if q.get('source') in ['unique_fallback', 'fallback'])
-        
         print(f"\n📊 Generation Source Breakdown:")
         print(f"  xAI Generated: {xai_questions}/{total_questions} ({(xai_questions/total_questions*100):.1f}%)")
         print(f"  Unique Fallback: {fallback_questions}/{total_questions} ({(fallback_questions/total_questions*100):.1f}%)")
@@ -9,15 +9,16 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from xai_question_generator import XAIQuestionGenerator
+from xai_question_generator import XAIQuestionGenerator, get_xai_generator
 
 def test_xai_integration():
     """Test xAI integration with GRE algebra question"""
     print("🧪 Testing xAI Integration...")
     
     try:
-        # Initialize generator
-        generator = XAIQuestionGenerator()
+        # Reuse the module's generator; constructing one here only when that
+        # failed to start, so the real error is raised and reported below
+        generator = get_xai_generator() or XAIQuestionGenerator()
         
         # Test with GRE quant algebra as requested
         print("📚 Generating GRE algebra question...")
@@ -30,7 +31,8 @@ def test_xai_integration():
         question = questions[0]
         print("✅ Question generated successfully")
         
-        # Verify OpenAI format compatibility
+        # Verify OpenAI format compatibility, independently of the
+        # generator's own validation so a bug there can't hide here
         required_fields = ['question', 'options', 'answer', 'explanation']
         missing_fields = [field for field in required_fields if field not in question]
         
@@ -5,26 +5,187 @@ Replaces OpenAI with xAI for generating exam questions with identical JSON forma
 
 import os
 import json
+import atexit
+import functools
+import importlib.util
 import logging
+import math
+import queue
+import random
+import threading
 import time
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Optional
-from openai import OpenAI
+import httpx
+from openai import (
+    APIConnectionError, APITimeoutError, InternalServerError, OpenAI, RateLimitError
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+
+# Shape every generated question must have, shared with the xAI tests
+REQUIRED_FIELDS = ("question", "options", "answer", "explanation")
+REQUIRED_FIELD_SET = frozenset(REQUIRED_FIELDS)
+OPTION_KEYS = ("A", "B", "C", "D")
+VALID_ANSWERS = frozenset(OPTION_KEYS)
+
+
+def question_errors(q: Dict) -> List[str]:
+    """Every way q breaks the question format, in one pass (empty if valid)"""
+    # One keys-view superset test; missing fields are only listed on failure
+    errors = [] if q.keys() >= REQUIRED_FIELD_SET else [
+        f"missing required field: {field}" for field in REQUIRED_FIELDS if field not in q
+    ]
+    options = q.get("options")
+    if "options" in q and not isinstance(options, dict):
+        errors.append("options must be a dictionary")
+    elif isinstance(options, dict) and not options.keys() >= VALID_ANSWERS:
+        errors.extend(f"missing option: {opt}" for opt in OPTION_KEYS if opt not in options)
+    # A non-string answer (say a list) can't be hashed into the set lookup
+    if "answer" in q and not (isinstance(q["answer"], str) and q["answer"] in VALID_ANSWERS):
+        errors.append(f"invalid answer: {q['answer']}")
+    return errors
+
+
+XAI_BASE_URL = "https://api.x.ai/v1"
+
+DIFFICULTY_GUIDANCE = MappingProxyType({
+    'easy': "Focus on fundamental concepts. Use straightforward language and basic applications. Avoid complex multi-step problems.",
+    'medium': "Include moderate complexity with some multi-step reasoning. Test understanding of core concepts with practical applications.",
+    'hard': "Challenge the user with complex scenarios, advanced applications, and sophisticated reasoning. Include edge cases and nuanced concepts."
+})
+
+# Learning guidance for scores below 40, 40-70 and above 70, in that order
+SCORE_GUIDANCE = (
+    "The user is struggling with this topic. Provide questions that build confidence and reinforce basic understanding.",
+    "The user has moderate understanding. Provide questions that challenge them to apply concepts in new ways.",
+    "The user has strong understanding. Provide challenging questions that test advanced applications and edge cases."
+)
+
+
+def difficulty_guidance(difficulty: str) -> str:
+    """Prompt guidance for a difficulty level; ValueError for unknown levels"""
+    try:
+        return DIFFICULTY_GUIDANCE[difficulty]
+    except KeyError:
+        raise ValueError(f"Unknown difficulty: {difficulty!r} (expected one of {', '.join(DIFFICULTY_GUIDANCE)})") from None
+
+
+# How each score band reads in the prompt's USER CONTEXT
+SCORE_BANDS = ("below 40%", "40-70%", "above 70%")
+
+
+def score_band(user_score: float) -> int:
+    """Index into SCORE_BANDS / SCORE_GUIDANCE of the band a user's score falls in"""
+    return (user_score >= 40) + (user_score > 70)
+
+# Rules and output format every generated question follows. Kept free of
+# per-request values so the system prompts start with identical text.
+QUESTION_RULES = """CRITICAL REQUIREMENTS:
+1. Generate unique, original multiple-choice questions that have never been used before
+2. Each question must have exactly 4 options (A, B, C, D)
+3. Ensure one correct answer and three plausible distractors
+4. Match the authentic difficulty and style of the exam named below exactly
+5. Provide detailed explanations for correct answers
+
+OUTPUT FORMAT (JSON only):
+{
+  "questions": [
+    {
+      "question": "Question text here",
+      "options": {
+        "A": "First option",
+        "B": "Second option", 
+        "C": "Third option",
+        "D": "Fourth option"
+      },
+      "answer": "A",
+      "explanation": "Detailed explanation why A is correct and others are wrong"
+    }
+  ]
+}"""
+
+STATIC_SYSTEM_PROMPT = """You are an expert exam question generator with deep understanding of exam patterns and difficulty levels.
+
+""" + QUESTION_RULES + """
+
+Use your reasoning capabilities to ensure questions are:
+- Pedagogically sound and test real understanding
+- Free from ambiguity or trick elements
+- Appropriate for the target exam level
+- Varied in approach and content areas"""
+
+STATIC_ADAPTIVE_POLICY = """You are an expert adaptive exam question generator with deep understanding of learner progression.
+
+ADAPTIVE PRINCIPLES:
+1. Questions must match the user's current ability level in the topic, given in USER CONTEXT below
+2. Provide appropriate scaffolding for the difficulty level
+3. Ensure questions are neither too easy nor too hard for their current score
+4. Focus specifically on the topic and exam named below
+
+""" + QUESTION_RULES
+
+# Completion budget: the JSON wrapper plus an allowance per question
+# (stem, four options and a detailed explanation). TOKENS_PER_QUESTION is
+# only the starting allowance; each generator raises it to the largest
+# per-question size xAI's usage reports show, plus TOKEN_HEADROOM
+COMPLETION_BASE_TOKENS = 200
+TOKENS_PER_QUESTION = 500
+TOKEN_HEADROOM = 1.25
+MAX_COMPLETION_TOKENS = 8000
+
+
+class CompletionTruncated(Exception):
+    """xAI stopped at max_tokens before finishing its reply"""
+    
+    def __init__(self, max_tokens: int):
+        super().__init__(f"xAI reply cut off at max_tokens={max_tokens}")
+        self.max_tokens = max_tokens
+
+
+# xAI failures worth another attempt: throttling, network trouble, 5xx and
+# replies cut off by the completion budget (retried with a bigger one)
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError, CompletionTruncated)
+
+# HTTP/2 lets concurrent requests share one connection, but httpx only
+# speaks it with the optional h2 package installed
+XAI_HTTP2 = importlib.util.find_spec("h2") is not None
+XAI_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+
+
+@lru_cache(maxsize=1)
+def get_xai_client() -> OpenAI:
+    """Shared xAI client, so every generator reuses one HTTP connection pool"""
+    http_client = httpx.Client(http2=XAI_HTTP2, limits=XAI_POOL_LIMITS)
+    client = OpenAI(
+        base_url=XAI_BASE_URL,
+        api_key=os.environ.get("XAI_API_KEY"),
+        http_client=http_client
+    )
+    atexit.register(client.close)
+    return client
+
+
 class XAIQuestionGenerator:
     """xAI-powered question generator using Grok models"""
     
     def __init__(self):
         """Initialize xAI client with custom endpoint"""
+        # Completion allowance per question, raised as replies are measured
+        self.tokens_per_question = TOKENS_PER_QUESTION
         try:
-            self.client = OpenAI(
-                base_url="https://api.x.ai/v1",
-                api_key=os.environ.get("XAI_API_KEY")
-            )
+            self.client = get_xai_client()
             logger.info("✅ xAI client initialized successfully")
         except Exception as e:
-            logger.error(f"❌ Failed to initialize xAI client: {e}")
+            logger.error("❌ Failed to initialize xAI client: %s", e)
             raise
     
     def generate_questions(self, exam_type: str, topic: str = None, count: int = 5) -> List[Dict]:
@@ -47,19 +208,19 @@ class XAIQuestionGenerator:
             system_prompt = self._create_system_prompt(exam_type, topic)
             user_prompt = self._create_user_prompt(exam_type, topic, count)
             
-            logger.info(f"🤖 Generating {count} {exam_type} questions{f' on {topic}' if topic else ''}")
+            logger.info("🤖 Generating %d %s questions%s", count, exam_type, f" on {topic}" if topic else "")
             
             # Call xAI API with retry logic
-            response = self._call_xai_with_retry(system_prompt, user_prompt)
+            response = self._call_xai_with_retry(system_prompt, user_prompt, count)
             
             # Parse and validate response
             questions = self._parse_response(response, exam_type)
             
-            logger.info(f"✅ Generated {len(questions)} questions successfully")
+            logger.info("✅ Generated %d questions successfully", len(questions))
             return questions
             
         except Exception as e:
-            logger.error(f"❌ Question generation failed: {e}")
+            logger.error("❌ Question generation failed: %s", e)
             raise
     
     def generate_adaptive_questions(self, exam_type: str, topic: str, difficulty: str, user_score: float, count: int = 1) -> List[Dict]:
@@ -80,141 +241,83 @@ class XAIQuestionGenerator:
             count = min(count, 5)  # Limit for adaptive generation
             
             # Create adaptive system prompt with user context
-            system_prompt = self._create_adaptive_system_prompt(exam_type, topic, difficulty, user_score)
+            system_prompt = self._create_adaptive_system_prompt(exam_type, topic, difficulty, score_band(user_score))
             user_prompt = self._create_adaptive_user_prompt(exam_type, topic, difficulty, count)
             
-            logger.info(f"🎯 Generating {count} adaptive {difficulty} {exam_type} questions on {topic} (user score: {user_score:.1f}%)")
+            logger.info("🎯 Generating %d adaptive %s %s questions on %s (user score: %.1f%%)", count, difficulty, exam_type, topic, user_score)
             
             # Call xAI API with retry logic
-            response = self._call_xai_with_retry(system_prompt, user_prompt)
+            response = self._call_xai_with_retry(system_prompt, user_prompt, count)
             
             # Parse and validate response
             questions = self._parse_response(response, exam_type)
             
-            # Add difficulty metadata
-            for question in questions:
-                question['difficulty'] = difficulty
-                question['adaptive'] = True
-                question['user_context'] = {
-                    'score': user_score,
-                    'topic': topic,
-                    'target_difficulty': difficulty
-                }
+            self._tag_adaptive(questions, topic, difficulty, user_score)
             
-            logger.info(f"✅ Generated {len(questions)} adaptive {difficulty} questions")
+            logger.info("✅ Generated %d adaptive %s questions", len(questions), difficulty)
             return questions
             
         except Exception as e:
-            logger.error(f"❌ Adaptive question generation failed: {e}")
+            logger.error("❌ Adaptive question generation failed: %s", e)
             raise
     
-    def _create_system_prompt(self, exam_type: str, topic: str = None) -> str:
-        """Create system prompt optimized for Grok's reasoning capabilities"""
+    @staticmethod
+    def _tag_adaptive(questions: List[Dict], topic: str, difficulty: str, user_score: float):
+        """Add difficulty metadata to adaptive questions"""
+        for question in questions:
+            question['difficulty'] = difficulty
+            question['adaptive'] = True
+            question['user_context'] = {
+                'score': user_score,
+                'topic': topic,
+                'target_difficulty': difficulty
+            }
+    
+    # Each system prompt is a static block, identical on every request so
+    # providers can cache it as a prefix, followed by the few lines that
+    # vary. The builders are cached, as their inputs form a small set.
+    
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _create_system_prompt(exam_type: str, topic: str = None) -> str:
+        """Create system prompt optimized for Grok's reasoning capabilities.
         
-        base_prompt = f"""You are an expert {exam_type} question generator with deep understanding of exam patterns and difficulty levels.
-
-CRITICAL REQUIREMENTS:
-1. Generate unique, original multiple-choice questions that have never been used before
-2. Each question must have exactly 4 options (A, B, C, D)
-3. Ensure one correct answer and three plausible distractors
-4. Match authentic {exam_type} difficulty and style exactly
-5. Provide detailed explanations for correct answers
-
-OUTPUT FORMAT (JSON only):
-{{
-  "questions": [
-    {{
-      "question": "Question text here",
-      "options": {{
-        "A": "First option",
-        "B": "Second option", 
-        "C": "Third option",
-        "D": "Fourth option"
-      }},
-      "answer": "A",
-      "explanation": "Detailed explanation why A is correct and others are wrong"
-    }}
-  ]
-}}
-
-Use your reasoning capabilities to ensure questions are:
-- Pedagogically sound and test real understanding
-- Free from ambiguity or trick elements
-- Appropriate for the target exam level
-- Varied in approach and content areas"""
+        The topic goes in the user prompt, so this only varies by exam.
+        """
+        return STATIC_SYSTEM_PROMPT + f"""
 
-        if topic:
-            base_prompt += f"\n\nSPECIFIC FOCUS: All questions must cover {topic} within {exam_type}."
-            
-        return base_prompt
+EXAM: {exam_type}. Match authentic {exam_type} difficulty and style exactly."""
     
-    def _create_adaptive_system_prompt(self, exam_type: str, topic: str, difficulty: str, user_score: float) -> str:
-        """Create adaptive system prompt with user context"""
-        
-        difficulty_guidance = {
-            'easy': "Focus on fundamental concepts. Use straightforward language and basic applications. Avoid complex multi-step problems.",
-            'medium': "Include moderate complexity with some multi-step reasoning. Test understanding of core concepts with practical applications.",
-            'hard': "Challenge the user with complex scenarios, advanced applications, and sophisticated reasoning. Include edge cases and nuanced concepts."
-        }
-        
-        score_context = ""
-        if user_score < 40:
-            score_context = "The user is struggling with this topic. Provide questions that build confidence and reinforce basic understanding."
-        elif user_score <= 70:
-            score_context = "The user has moderate understanding. Provide questions that challenge them to apply concepts in new ways."
-        else:
-            score_context = "The user has strong understanding. Provide challenging questions that test advanced applications and edge cases."
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _create_adaptive_system_prompt(exam_type: str, topic: str, difficulty: str, band: int) -> str:
+        """Create adaptive system prompt with user context.
         
-        adaptive_prompt = f"""You are an expert {exam_type} adaptive question generator with deep understanding of learner progression.
-
-USER CONTEXT:
-- Current score in {topic}: {user_score:.1f}%
-- Target difficulty: {difficulty}
-- Learning guidance: {score_context}
+        Only the user's score band goes in, not the raw score, so the
+        prompt (and its cache entry) is shared by everyone in that band.
+        """
+        return STATIC_ADAPTIVE_POLICY + f"""
 
 DIFFICULTY REQUIREMENTS FOR {difficulty.upper()}:
-{difficulty_guidance[difficulty]}
+{difficulty_guidance(difficulty)}
 
-ADAPTIVE PRINCIPLES:
-1. Questions must match the user's current ability level in {topic}
-2. Provide appropriate scaffolding for the difficulty level
-3. Ensure questions are neither too easy nor too hard for their current score
-4. Focus specifically on {topic} within {exam_type}
-
-CRITICAL REQUIREMENTS:
-1. Generate unique, original multiple-choice questions that have never been used before
-2. Each question must have exactly 4 options (A, B, C, D)
-3. Ensure one correct answer and three plausible distractors
-4. Match authentic {exam_type} difficulty and style exactly
-5. Provide detailed explanations for correct answers
+TOPIC FOCUS: All questions must specifically test {topic} concepts within {exam_type} at {difficulty} level, in authentic {exam_type} style.
 
-OUTPUT FORMAT (JSON only):
-{{
-  "questions": [
-    {{
-      "question": "Question text here",
-      "options": {{
-        "A": "First option",
-        "B": "Second option", 
-        "C": "Third option",
-        "D": "Fourth option"
-      }},
-      "answer": "A",
-      "explanation": "Detailed explanation why A is correct and others are wrong"
-    }}
-  ]
-}}
-
-TOPIC FOCUS: All questions must specifically test {topic} concepts within {exam_type} at {difficulty} level."""
-        
-        return adaptive_prompt
+USER CONTEXT:
+- Current score in {topic}: {SCORE_BANDS[band]}
+- Target difficulty: {difficulty}
+- Learning guidance: {SCORE_GUIDANCE[band]}"""
     
-    def _create_user_prompt(self, exam_type: str, topic: str = None, count: int = 5) -> str:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _create_user_prompt(exam_type: str, topic: str = None, count: int = 5) -> str:
         """Create user prompt for specific question generation"""
         
         topic_text = f" focusing on {topic}" if topic else ""
+        # Kept out of the system prompt so that stays the same across topics
+        focus_text = f"\n\nSPECIFIC FOCUS: All questions must cover {topic} within {exam_type}." if topic else ""
         
-        return f"""Generate exactly {count} unique {exam_type} multiple-choice questions{topic_text}.
+        return f"""Generate exactly {count} unique {exam_type} multiple-choice questions{topic_text}.{focus_text}
 
 Requirements:
 - Each question must be completely original and never used before
@@ -225,95 +328,155 @@ Requirements:
 
 Generate the questions now:"""
     
-    def _call_xai_with_retry(self, system_prompt: str, user_prompt: str, max_retries: int = 3) -> str:
-        """Call xAI API with exponential backoff retry logic"""
+    def _call_xai_with_retry(self, system_prompt: str, user_prompt: str, count: int = 10, max_retries: int = 3) -> str:
+        """Call xAI API, retrying transient failures with jittered exponential backoff"""
         
+        max_tokens = self._completion_budget(count)
         for attempt in range(max_retries):
             try:
                 response = self.client.chat.completions.create(
-                    model="grok-2-1212",  # Use latest Grok model
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    max_tokens=4000,
-                    temperature=0.8  # Balanced creativity for question variety
+                    **self._completion_kwargs(system_prompt, user_prompt, max_tokens)
                 )
                 
-                return response.choices[0].message.content
+                return self._completion_text(response, count, max_tokens)
                 
             except Exception as e:
-                wait_time = (2 ** attempt) * 1  # Exponential backoff: 1s, 2s, 4s
-                logger.warning(f"⚠️  xAI API attempt {attempt + 1} failed: {e}")
-                
-                if attempt < max_retries - 1:
-                    logger.info(f"⏳ Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"❌ All {max_retries} xAI API attempts failed")
+                wait_time = self._retry_wait(e, attempt, max_retries)
+                if wait_time is None:
                     raise
+                if isinstance(e, CompletionTruncated):
+                    max_tokens = min(MAX_COMPLETION_TOKENS, max_tokens * 2)
+                time.sleep(wait_time)
+    
+    @staticmethod
+    def _retry_wait(error: Exception, attempt: int, max_retries: int) -> Optional[float]:
+        """
+        Retry policy for _call_xai_with_retry
+        
+        Returns how long to wait before the next attempt, or None when error
+        should be raised: it isn't transient (a bad request would only fail
+        again), a truncated reply already had the largest budget, or this
+        was the last attempt. Waits are drawn at random up to 1s, 2s, 4s...
+        (capped at 16s) so concurrent callers don't retry in step; a
+        truncated reply is retried straight away.
+        """
+        logger.warning("⚠️  xAI API attempt %d failed: %s", attempt + 1, error)
+        
+        if not isinstance(error, RETRYABLE_ERRORS):
+            logger.error("❌ xAI API error is not retryable")
+            return None
+        if isinstance(error, CompletionTruncated) and error.max_tokens >= MAX_COMPLETION_TOKENS:
+            logger.error("❌ xAI reply does not fit the largest completion budget")
+            return None
+        if attempt >= max_retries - 1:
+            logger.error("❌ All %d xAI API attempts failed", max_retries)
+            return None
+        if isinstance(error, CompletionTruncated):
+            return 0
+        
+        wait_time = random.uniform(0, min(16, 2 ** attempt))
+        logger.info("⏳ Retrying in %.1f seconds...", wait_time)
+        return wait_time
+    
+    def _completion_budget(self, count: int) -> int:
+        """max_tokens for a reply of count questions, at the measured size per question"""
+        return min(MAX_COMPLETION_TOKENS, COMPLETION_BASE_TOKENS + count * self.tokens_per_question)
+    
+    def _completion_text(self, response, count: int, max_tokens: int) -> str:
+        """
+        The reply's text, after measuring it against the budget
+        
+        Raises CompletionTruncated when xAI hit max_tokens, as the JSON
+        would be cut off. Otherwise a reply larger per question than the
+        current allowance raises it, so later budgets fit what xAI writes.
+        """
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            raise CompletionTruncated(max_tokens)
+        
+        usage = getattr(response, "usage", None)
+        if usage is not None and usage.completion_tokens and count:
+            measured = min(
+                math.ceil(usage.completion_tokens / count * TOKEN_HEADROOM),
+                MAX_COMPLETION_TOKENS - COMPLETION_BASE_TOKENS
+            )
+            if measured > self.tokens_per_question:
+                self.tokens_per_question = measured
+                logger.info("📏 Completion allowance raised to %d tokens per question", measured)
+        return choice.message.content
+    
+    @staticmethod
+    def _completion_kwargs(system_prompt: str, user_prompt: str, max_tokens: int) -> Dict:
+        """Chat completion arguments for the xAI calls.
+        
+        max_tokens comes from _completion_budget, sized to the number of
+        questions asked for, so a runaway reply for a single question stops
+        early.
+        """
+        return {
+            "model": "grok-2-1212",  # Use latest Grok model
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "response_format": {"type": "json_object"},
+            "max_tokens": max_tokens,
+            "temperature": 0.8  # Balanced creativity for question variety
+        }
     
     def _parse_response(self, response: str, exam_type: str) -> List[Dict]:
         """Parse and validate xAI response to ensure format compatibility"""
         
         try:
-            # Parse JSON response
-            data = json.loads(response)
-            
-            if "questions" not in data or not isinstance(data["questions"], list):
-                raise ValueError("Invalid response format: missing 'questions' array")
-            
-            validated_questions = []
-            
-            for i, q in enumerate(data["questions"]):
-                # Validate required fields
-                required_fields = ["question", "options", "answer", "explanation"]
-                for field in required_fields:
-                    if field not in q:
-                        raise ValueError(f"Question {i+1} missing required field: {field}")
-                
-                # Validate options format
-                if not isinstance(q["options"], dict):
-                    raise ValueError(f"Question {i+1} options must be a dictionary")
-                
-                expected_options = ["A", "B", "C", "D"]
-                for opt in expected_options:
-                    if opt not in q["options"]:
-                        raise ValueError(f"Question {i+1} missing option: {opt}")
-                
-                # Validate answer is valid option
-                if q["answer"] not in expected_options:
-                    raise ValueError(f"Question {i+1} invalid answer: {q['answer']}")
-                
-                # Clean and format question
-                clean_question = {
-                    "question": str(q["question"]).strip(),
-                    "options": {
-                        "A": str(q["options"]["A"]).strip(),
-                        "B": str(q["options"]["B"]).strip(), 
-                        "C": str(q["options"]["C"]).strip(),
-                        "D": str(q["options"]["D"]).strip()
-                    },
-                    "answer": str(q["answer"]).strip(),
-                    "explanation": str(q["explanation"]).strip(),
-                    "exam_type": exam_type,
-                    "generated_by": "xai_grok"
-                }
-                
-                validated_questions.append(clean_question)
-            
-            logger.info(f"✅ Validated {len(validated_questions)} questions")
-            return validated_questions
-            
+            data = self._load_json(response)
+            return self._clean_questions(data.get("questions"), exam_type)
+        except Exception as e:
+            logger.error("❌ Response validation failed: %s", e)
+            raise
+    
+    @staticmethod
+    def _load_json(response: str) -> Dict:
+        try:
+            # orjson's decode error subclasses json's
+            return orjson.loads(response) if orjson is not None else json.loads(response)
         except json.JSONDecodeError as e:
-            logger.error(f"❌ JSON parsing failed: {e}")
-            logger.error(f"Raw response: {response[:500]}...")
+            logger.error("❌ JSON parsing failed: %s", e)
+            logger.error("Raw response: %.500s...", response)
             raise ValueError(f"Invalid JSON response from xAI: {e}")
+    
+    @staticmethod
+    def _clean_question(q, number: int, exam_type: str) -> Dict:
+        """Validate one question and normalize it; number is its 1-based position"""
         
-        except Exception as e:
-            logger.error(f"❌ Response validation failed: {e}")
-            raise
+        if not isinstance(q, dict):
+            raise ValueError(f"Question {number} must be an object")
+        errors = question_errors(q)
+        if errors:
+            raise ValueError(f"Question {number} {errors[0]}")
+        
+        return {
+            "question": str(q["question"]).strip(),
+            "options": {key: str(q["options"][key]).strip() for key in OPTION_KEYS},
+            "answer": str(q["answer"]).strip(),
+            "explanation": str(q["explanation"]).strip(),
+            "exam_type": exam_type,
+            "generated_by": "xai_grok"
+        }
+    
+    @staticmethod
+    def _clean_questions(raw_questions, exam_type: str) -> List[Dict]:
+        """Validate questions from a response and normalize them"""
+        
+        if not isinstance(raw_questions, list):
+            raise ValueError("Invalid response format: missing 'questions' array")
+        
+        validated_questions = [
+            XAIQuestionGenerator._clean_question(q, number, exam_type)
+            for number, q in enumerate(raw_questions, 1)
+        ]
+        
+        logger.info("✅ Validated %d questions", len(validated_questions))
+        return validated_questions
     
     def test_integration(self) -> bool:
         """Test xAI integration with a simple question generation"""
@@ -329,23 +492,23 @@ Generate the questions now:"""
                 return False
             
             question = questions[0]
-            required_fields = ["question", "options", "answer", "explanation"]
-            
-            for field in required_fields:
-                if field not in question:
-                    logger.error(f"❌ Missing field in test question: {field}")
-                    return False
+            errors = question_errors(question)
+            if errors:
+                logger.error("❌ Invalid test question: %s", '; '.join(errors))
+                return False
             
             logger.info("✅ xAI integration test passed")
-            logger.info(f"Test question: {question['question'][:100]}...")
+            logger.info("Test question: %.100s...", question['question'])
             
             return True
             
         except Exception as e:
-            logger.error(f"❌ xAI integration test failed: {e}")
+            logger.error("❌ xAI integration test failed: %s", e)
             return False
     
-    def _create_adaptive_user_prompt(self, exam_type: str, topic: str, difficulty: str, count: int) -> str:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _create_adaptive_user_prompt(exam_type: str, topic: str, difficulty: str, count: int) -> str:
         """Create adaptive user prompt"""
         return f"""Generate {count} {difficulty}-level {exam_type} multiple-choice question{'s' if count != 1 else ''} specifically focused on {topic}.
 
@@ -358,10 +521,164 @@ Requirements:
 
 Respond with valid JSON only."""
 
-# Initialize global instance
-try:
-    xai_generator = XAIQuestionGenerator()
-    logger.info("🚀 Global xAI question generator initialized")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize global xAI generator: {e}")
-    xai_generator = None
\ No newline at end of file
+
+# Prefetching is opt-in (XAI_PREFETCH=1): every worker keeps its own pools
+# and fills them with extra xAI calls, so turning it on multiplies API
+# spend by the number of workers
+PREFETCH_ENABLED = os.environ.get("XAI_PREFETCH", "").lower() in ("1", "true", "yes")
+
+# Only these (exam_type, topic) pairs are ever prefetched: each exam's
+# general questions. Anything else, including user-supplied topics, is
+# generated on demand, so arbitrary input can't create pools or start paid
+# background generation (in every worker).
+PREFETCH_KEYS = frozenset((exam_type, None) for exam_type in (
+    'GMAT', 'GRE', 'MCAT', 'USMLE_STEP_1', 'USMLE_STEP_2',
+    'NCLEX', 'LSAT', 'IELTS', 'TOEFL', 'PMP', 'CFA', 'ACT', 'SAT'
+))
+
+
+class QuestionPrefetcher:
+    """Keeps ready-made questions for the most requested PREFETCH_KEYS pairs.
+
+    Requests take questions from these pools and only wait on xAI for what
+    a pool can't cover. A background thread tops up the pools that run low.
+    Each pooled question is handed out once, so questions stay unique.
+    Demand is halved every refill pass, and a pair whose demand has died
+    out loses its pool, so only recently busy pairs cost anything.
+    """
+    
+    POOL_SIZE = 32  # Most questions held per pair
+    LOW_WATERMARK = 8  # Refill a pool once it drops below this
+    REFILL_COUNT = 10  # Questions per refill call, the most one call gives
+    MAX_POOLS = 4  # Only this many most requested pairs are kept filled
+    REFILL_INTERVAL = 30  # Seconds between checks when nothing wakes the thread
+    
+    def __init__(self, generator: XAIQuestionGenerator, allowed_keys=PREFETCH_KEYS):
+        self.generator = generator
+        self.allowed_keys = frozenset(allowed_keys)
+        self.pools = {}
+        self.demand = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.start_lock = threading.Lock()
+        self.refill_thread = None
+        
+    def prewarm(self, specs: List[Dict]):
+        """Start filling pools for known busy pairs, each spec an exam_type and optional topic"""
+        with self.lock:
+            for spec in specs:
+                key = (spec['exam_type'], spec.get('topic'))
+                if key in self.allowed_keys:
+                    self.demand[key] += self.REFILL_COUNT
+        self._wake_refiller()
+        
+    def take_questions(self, exam_type: str, topic: str = None, count: int = 5) -> List[Dict]:
+        """count questions, from the pool where possible and generated live for the rest"""
+        key = (exam_type, topic)
+        if key not in self.allowed_keys:
+            return self.generator.generate_questions(exam_type, topic, count)
+        
+        questions = []
+        with self.lock:
+            self.demand[key] += count
+            pool = self.pools.get(key)
+        
+        while pool is not None and len(questions) < count:
+            try:
+                questions.append(pool.get_nowait())
+            except queue.Empty:
+                break
+        
+        with self.lock:
+            self.hits += len(questions)
+            self.misses += count - len(questions)
+        if pool is None or pool.qsize() < self.LOW_WATERMARK:
+            self._wake_refiller()
+        
+        if len(questions) < count:
+            questions += self.generator.generate_questions(exam_type, topic, count - len(questions))
+        logger.info("📦 Prefetch pools: %d hits, %d misses so far", self.hits, self.misses)
+        return questions
+        
+    def _wake_refiller(self):
+        # Started on first use (and restarted after a worker fork) rather
+        # than at import
+        if not (self.refill_thread and self.refill_thread.is_alive()):
+            with self.start_lock:
+                if not (self.refill_thread and self.refill_thread.is_alive()):
+                    self.refill_thread = threading.Thread(
+                        target=self._refill_loop,
+                        daemon=True,
+                        name="QuestionPrefetcher"
+                    )
+                    self.refill_thread.start()
+        self.wakeup.set()
+        
+    def _refill_loop(self):
+        while True:
+            self.wakeup.wait(self.REFILL_INTERVAL)
+            self.wakeup.clear()
+            self.refill()
+            
+    def refill(self):
+        """Top up every low pool among the most requested pairs, then decay demand"""
+        with self.lock:
+            busiest = [key for key, _ in self.demand.most_common(self.MAX_POOLS)]
+            # Pools outside the busiest pairs are dropped, so at most
+            # MAX_POOLS exist at once
+            self.pools = {key: self.pools.get(key) or queue.Queue(maxsize=self.POOL_SIZE) for key in busiest}
+            pools = list(self.pools.items())
+            for key in list(self.demand):
+                self.demand[key] //= 2
+                if not self.demand[key]:
+                    del self.demand[key]
+        
+        for (exam_type, topic), pool in pools:
+            while pool.qsize() < self.LOW_WATERMARK:
+                try:
+                    fresh = self.generator.generate_questions(exam_type, topic, self.REFILL_COUNT)
+                except Exception as e:
+                    logger.warning("⚠️  Prefetch for %s/%s failed: %s", exam_type, topic, e)
+                    break
+                if not fresh:
+                    break
+                for question in fresh:
+                    try:
+                        pool.put_nowait(question)
+                    except queue.Full:
+                        break
+
+# The shared instances are built on first use rather than at import, so a
+# gunicorn worker only sets up the xAI client (after forking) if it needs it
+@functools.cache
+def get_xai_generator() -> Optional[XAIQuestionGenerator]:
+    """The process-wide generator, or None if the xAI client can't be set up"""
+    try:
+        generator = XAIQuestionGenerator()
+        logger.info("🚀 Global xAI question generator initialized")
+        return generator
+    except Exception as e:
+        logger.error("❌ Failed to initialize global xAI generator: %s", e)
+        return None
+
+
+@functools.cache
+def get_question_prefetcher() -> Optional[QuestionPrefetcher]:
+    """The process-wide prefetcher, or None when PREFETCH_ENABLED is off or there's no generator"""
+    if not PREFETCH_ENABLED:
+        return None
+    generator = get_xai_generator()
+    return QuestionPrefetcher(generator) if generator else None
+
+
+def _forget_parent_clients():
+    # A forked worker must not reuse its parent's connections (or a
+    # generator holding them), so it rebuilds everything on first use
+    get_xai_client.cache_clear()
+    get_xai_generator.cache_clear()
+    get_question_prefetcher.cache_clear()
+
+
+os.register_at_fork(after_in_child=_forget_parent_clients)
\ No newline at end of file